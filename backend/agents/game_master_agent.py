@@ -29,11 +29,373 @@ OUTPUT CONTRACT:
     Frontend-ready JSON ONLY. No prose. No teaching. No evaluation.
 """
 
+import asyncio
+import copy
+import functools
+import hashlib
+import io
 import json
 import re
-from typing import Dict, Any, List
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import json5  # type: ignore
+except Exception:  # pragma: no cover
+    json5 = None  # type: ignore
+
 from core.agent_base import Agent
-from services.gemini_client import gemini_flash
+from services.gemini_client import (
+    ContextCacheManager,
+    gemini_flash,
+    gemini_client,
+    GEMINI_FLASH_MODEL,
+)
+
+
+# orjson parses LLM payloads ~2-3x faster; its JSONDecodeError subclasses
+# json.JSONDecodeError, so error handling is identical either way.
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json5_loads(text: str) -> Any:
+    """
+    Lenient JSON5 parse (trailing commas, unquoted keys); None if it fails.
+    
+    WHY: Far slower than strict parsing, but far cheaper than re-prompting
+    the LLM. Only reached after the strict parser has rejected the text.
+    """
+    if json5 is None:
+        return None
+    try:
+        return json5.loads(text)
+    except ValueError:
+        return None
+
+
+# Longer texts are recovered without caching, to bound the cache's memory
+_LENIENT_CACHE_MAX_CHARS = 16_384
+
+
+@functools.lru_cache(maxsize=256)
+def _lenient_json_text(text: str) -> Optional[str]:
+    """
+    Recover `text` with json5 and return it as strict JSON; None if it fails.
+    
+    WHY: json5 is pure Python, ~1000x slower than orjson, and retries and
+    hedges often get the same malformed text back. Caching the strict text
+    rather than the parsed dict means every hit re-parses into fresh objects
+    with the fast parser, which is cheaper than deep-copying a cached game.
+    """
+    parsed = _json5_loads(text)
+    if parsed is None:
+        return None
+    try:
+        return json.dumps(parsed, allow_nan=False)
+    except ValueError:  # NaN/Infinity are valid JSON5 but not JSON
+        return None
+
+
+class LLMJsonError(ValueError):
+    """
+    An LLM response that no parser could read.
+    
+    WHY: Most of these are caught and discarded by the retry loop, so the
+    message (with its copy of the response head) is only built if someone
+    actually prints or logs the error.
+    """
+    
+    def __init__(self, raw_text: str, parse_error: Exception):
+        super().__init__(raw_text, parse_error)
+        self.raw_text = raw_text
+        self.parse_error = parse_error
+    
+    def __str__(self) -> str:
+        return (
+            f"LLM returned invalid JSON. "
+            f"Parse error: {self.parse_error}. "
+            f"Raw response: {self.raw_text[:200]}"
+        )
+
+
+# The only characters that can change the scanner's state; everything in
+# between is skipped by the regex engine instead of a Python-level loop.
+_JSON_STRUCTURAL_RE = re.compile(r'[{}"\\]')
+# Finds the character that decides whether a "{" starts the object
+_NON_SPACE_RE = re.compile(r'\S')
+
+
+class _JsonObjectScanner:
+    """
+    Incrementally locate the first balanced {...} object in streamed text.
+    
+    WHY: Anchored regex stripping (^[^{]*, [^}]*$) mis-cuts responses with
+    stray braces in surrounding prose. A single pass that tracks depth,
+    string literals and escapes finds the real object boundaries, and
+    keeping that state between feed() calls lets a streaming caller stop
+    as soon as the object closes.
+    
+    Prose quotes are not tracked (an unbalanced one would hide the object),
+    so a "{" in prose is told apart by what follows it: a JSON object opens
+    with a key or closes at once, so only a "{" whose next non-space
+    character is '"' or '}' can start one.
+    
+    `start`/`end` are offsets into the concatenation of all fed text.
+    """
+    __slots__ = ("depth", "start", "end", "in_string", "escaped_at", "unconfirmed", "_offset")
+    
+    def __init__(self):
+        self.depth = 0
+        self.start = -1
+        self.end = -1
+        self.in_string = False
+        self.escaped_at = -1    # Offset of the character after a backslash
+        self.unconfirmed = False    # Start "{" seen; its next character is not yet
+        self._offset = 0
+    
+    def feed(self, text: str) -> bool:
+        """Consume more text; return True once the object is complete."""
+        if self.end >= 0:
+            return True
+        offset = self._offset
+        if self.unconfirmed:
+            # The last chunk ended right after a candidate "{"
+            self._confirm_start(text, 0)
+            if self.unconfirmed:
+                self._offset += len(text)
+                return False
+        for match in _JSON_STRUCTURAL_RE.finditer(text):
+            i = offset + match.start()
+            ch = match.group()
+            if self.in_string:
+                if i == self.escaped_at:
+                    continue
+                if ch == "\\":
+                    self.escaped_at = i + 1
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                # Quotes in prose outside the object are not JSON strings.
+                self.in_string = self.depth > 0
+            elif ch == "{":
+                if self.depth == 0:
+                    self.start = i
+                    self.unconfirmed = True
+                    if not self._confirm_start(text, match.end()):
+                        # Prose brace (or undecided until the next chunk)
+                        if self.unconfirmed:
+                            self.depth = 1
+                            break
+                        continue
+                self.depth += 1
+            elif ch == "}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = i + 1
+                    return True
+        self._offset += len(text)
+        return False
+    
+    def _confirm_start(self, text: str, pos: int) -> bool:
+        """
+        Decide a pending start "{" from the first non-space character at or
+        after text[pos]; True once it is confirmed as an object start.
+        
+        A rejected "{" is forgotten and scanning resumes in prose; with no
+        such character in `text`, the decision waits for the next feed().
+        """
+        match = _NON_SPACE_RE.search(text, pos)
+        if match is None:
+            return False
+        self.unconfirmed = False
+        if match.group() in '"}':
+            return True
+        self.start = -1
+        self.depth = 0
+        return False
+
+
+def _find_json_object(text: str) -> str:
+    """
+    Return the first balanced {...} object in `text`.
+    
+    Falls back to the text from the first "{" (or the whole text) when no
+    balanced object exists, so json.loads reports a meaningful error.
+    """
+    first = text.find("{")
+    if first < 0:
+        return text.strip()
+    
+    # Leading prose cannot open a string or an object, so the scanner can
+    # take the whole text and no copy of the tail is made.
+    scanner = _JsonObjectScanner()
+    if scanner.feed(text):
+        return text[scanner.start:scanner.end]
+    
+    return text[first:].strip()
+
+
+async def _close_stream(response, chunks) -> None:
+    """
+    End a streamed generation, cancelling the request if it is still open.
+    
+    WHY: Leaving `async for` early does not close the RPC: the gRPC call and
+    its reader reference each other, so it stays open (and Gemini keeps
+    generating) until the cycle collector runs. The pinned SDK keeps the
+    call only as the frame of its private stream iterator, so the call is
+    cancelled from there before both iterators are closed.
+    """
+    iterator = getattr(response, "_iterator", None)
+    frame = getattr(iterator, "ag_frame", None)
+    call = frame.f_locals.get("self") if frame is not None else None
+    if call is not None and callable(getattr(call, "cancel", None)):
+        call.cancel()
+    for stream in (chunks, iterator):
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+_NUANCE_GUIDANCE_HEADER = "\n\nPRIORITY BOUNDARIES TO TEST:\n"
+
+# Appended to the prompt of a hedge request (see _generate_hedged)
+_STRICT_JSON_SUFFIX = (
+    "\n\nSTRICT: Return ONLY valid JSON matching the output schema exactly. "
+    "No markdown fences, no extra text."
+)
+
+
+# Valid swipe-sort answer_key values
+_SWIPE_SIDES = frozenset({"left", "right"})
+
+
+class _GameSpec(NamedTuple):
+    """Top-level shape of one game type (see _validate_game_structure)."""
+    label: str                                       # Prefix for error messages
+    required: frozenset                              # Checked with one set difference
+    type_checks: Tuple[Tuple[str, type, str], ...]  # (field, type, error)
+
+
+# Built once at import and read-only: validation is a single lookup here.
+# Cross-field rules (sizes, coverage, membership) stay per game type.
+_GAME_SPECS = MappingProxyType({
+    "swipe_sort": _GameSpec(
+        label="Swipe-sort",
+        required=frozenset({"left_category", "right_category", "cards", "answer_key", "why"}),
+        type_checks=(
+            ("cards", list, "'cards' must be a list"),
+            ("answer_key", dict, "'answer_key' must be an object mapping card->left/right"),
+            ("why", dict, "'why' must be an object mapping card->rationale"),
+        ),
+    ),
+    "impostor": _GameSpec(
+        label="Impostor",
+        required=frozenset({"options", "impostor", "why"}),
+        type_checks=(
+            ("options", list, "'options' must be a list"),
+        ),
+    ),
+    "match_pairs": _GameSpec(
+        label="Match-pairs",
+        required=frozenset({"pairs", "why"}),
+        type_checks=(
+            ("pairs", dict, "'pairs' must be a dictionary"),
+            ("why", dict, "'why' must be a dictionary mapping term->rationale"),
+        ),
+    ),
+})
+
+
+@functools.lru_cache(maxsize=1)
+def _get_model():
+    """
+    Process-wide Flash model shared by every GameMasterAgent.
+    
+    WHY: Agents may be built per request; constructing the model each time
+    would redo SDK client setup and lose the pooled connection.
+    """
+    return gemini_flash()
+
+
+@dataclass(frozen=True, slots=True)
+class GameRequest:
+    """A validated game generation request (see GameMasterAgent._validate_input)."""
+    game_type: str
+    concept: str
+    nuances: List[str]
+
+
+def _game_cache_key(game_type: str, concept: str, nuances: List[str], variation: int) -> bytes:
+    """
+    Memoization key for one generated game (see _memoized_game).
+    
+    Built from exactly the concept and nuance slice the prompt uses, so
+    requests share an entry only when their prompts are identical. Includes
+    the instruction version so rubric edits invalidate old games, and is
+    hashed to 16 bytes so long concepts/nuances don't bloat the LRU.
+    """
+    raw = "\x1f".join((
+        str(GameMasterAgent.CONTEXT_CACHE_VERSION),
+        game_type,
+        concept,
+        "\x1e".join(nuances[:GameMasterAgent.MAX_PROMPT_NUANCES]),
+        str(variation),
+    ))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
+def _remember_game(key: bytes, game: Dict[str, Any]) -> None:
+    """Store a game in the shared LRU, evicting the oldest entries."""
+    cache = GameMasterAgent._game_cache
+    cache[key] = game
+    cache.move_to_end(key)
+    while len(cache) > GameMasterAgent.GAME_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+# The learner-facing items of each game type, used to spot duplicate games
+_GAME_ITEM_FIELDS = {"swipe_sort": "cards", "impostor": "options", "match_pairs": "pairs"}
+
+
+def _game_fingerprint(game: Dict[str, Any]) -> bytes:
+    """Order/case-insensitive hash of a game's items (list items or pair terms)."""
+    items = game.get(_GAME_ITEM_FIELDS[game["game_type"]]) or []
+    normalized = sorted(str(item).strip().lower() for item in items)
+    return hashlib.blake2b("\x1f".join(normalized).encode("utf-8"), digest_size=8).digest()
+
+
+def _memoized_game(game_type: str):
+    """
+    Memoize an async `_generate_*(concept, nuances, variation)` method.
+    
+    WHY: Generation is stateless and near-deterministic per input, so the
+    same (concept, nuances, game_type, variation) from different learners
+    can reuse one LLM call. Entries live in a class-level LRU shared by all
+    agent instances. Callers pass use_cache=False to force fresh games
+    (e.g. a learner asking for more games on the same concept).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, concept: str, nuances: List[str], variation: int = 1, use_cache: bool = True):
+            cache = GameMasterAgent._game_cache
+            key = _game_cache_key(game_type, concept, nuances, variation)
+            if use_cache and key in cache:
+                cache.move_to_end(key)
+                return copy.deepcopy(cache[key])
+            
+            game = await func(self, concept, nuances, variation)
+            _remember_game(key, game)
+            return copy.deepcopy(game)
+        return wrapper
+    return decorator
 
 
 class GameMasterAgent(Agent):
@@ -49,7 +411,8 @@ class GameMasterAgent(Agent):
     # ARCHITECTURAL CONSTANTS
     # ============================================================================
     
-    SUPPORTED_GAME_TYPES = ["swipe_sort", "impostor", "match_pairs"]
+    SUPPORTED_GAME_TYPES: frozenset = frozenset({"swipe_sort", "impostor", "match_pairs"})
+    _SUPPORTED_GAME_TYPES_LIST = ("swipe_sort", "impostor", "match_pairs")  # Stable order for error messages
     
     # Game sizing parameters (cognitive load balanced)
     SWIPE_SORT_CARD_RANGE = (6, 8)      # Enough items to test patterns
@@ -63,9 +426,114 @@ class GameMasterAgent(Agent):
     GAMES_PER_BATCH = 2                  # Generate 2 games at a time
     MAX_GENERATION_ATTEMPTS = 3
     
+    # WHY JSON MODE: Gemini returns bare JSON instead of fenced/prose-wrapped
+    # output. A response_schema additionally constrains decoding to the game
+    # contract, but only impostor can have one: answer_key/why/pairs are maps
+    # with dynamic keys, which Gemini's schema subset cannot express.
+    GENERATION_CONFIG = {"response_mime_type": "application/json"}
+    RESPONSE_SCHEMAS = {
+        "impostor": {
+            "type": "OBJECT",
+            "properties": {
+                "game_type": {"type": "STRING", "format": "enum", "enum": ["impostor"]},
+                "options": {
+                    "type": "ARRAY",
+                    "items": {"type": "STRING"},
+                    "min_items": IMPOSTOR_OPTIONS_COUNT,
+                    "max_items": IMPOSTOR_OPTIONS_COUNT,
+                },
+                "impostor": {"type": "STRING"},
+                "why": {"type": "STRING"},
+            },
+            "required": ["game_type", "options", "impostor", "why"],
+        },
+    }
+    
+    # Hedged generation (see _generate_hedged)
+    HEDGE_DELAY_SECONDS = 12.0
+    MAX_CONCURRENT_HEDGES = 4
+    
+    # Responses longer than this (chars) are parsed off the event loop
+    PARSE_OFFLOAD_THRESHOLD = 16_384
+    
+    # Explicit context caches for the static per-game-type instructions.
+    # Bump CONTEXT_CACHE_VERSION whenever an instruction changes: caches are
+    # shared across processes by display name (gamemaster-v{N}-{game_type}).
+    CONTEXT_CACHE_VERSION = 2
+    CONTEXT_CACHE_TTL_SECONDS = 3600
+    CONTEXT_CACHE_REFRESH_MARGIN_SECONDS = 60
+    # First retry delay after a transient cache creation failure (see
+    # ContextCacheManager)
+    CONTEXT_CACHE_RETRY_SECONDS = 30
+    
+    # Rendered static instructions, keyed by game type (see _build_instruction)
+    _instructions: Dict[str, str] = {}
+    
+    # Context-cached models by cache name. Class-level so every agent
+    # instance shares the caches and the base model's connection pool
+    # (see _get_cached_model).
+    _context_caches = ContextCacheManager(
+        CONTEXT_CACHE_TTL_SECONDS, CONTEXT_CACHE_REFRESH_MARGIN_SECONDS, CONTEXT_CACHE_RETRY_SECONDS
+    )
+    _hedge_semaphore = asyncio.Semaphore(MAX_CONCURRENT_HEDGES)
+    
+    # Generated-game memoization (see _memoized_game), shared across instances
+    GAME_CACHE_SIZE = 1024
+    _game_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+    
+    # Nuances included in a prompt (and its memo key): the first N, in order
+    MAX_PROMPT_NUANCES = 4
+    
+    # Service tiers: "standard"/"priority" generate interactively; "flex" is
+    # latency-tolerant pre-generation, only available through the offline
+    # Batch Mode methods (see run() SERVICE TIERS)
+    SERVICE_TIERS = ("standard", "priority", "flex")
+    DEFAULT_SERVICE_TIER = "standard"
+    
+    # Gemini Batch Mode (offline bulk generation, 50% of Standard pricing)
+    BATCH_POLL_INTERVAL_SECONDS = 30
+    BATCH_TERMINAL_STATES = {
+        "JOB_STATE_SUCCEEDED",
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+        "JOB_STATE_EXPIRED",
+    }
+    
     def __init__(self):
         super().__init__("GameMasterAgent")
-        self.model = gemini_flash()
+        # Built on first generation (see `model`), so bad input fails fast
+        self._model = None
+        # (game_type, prompt) -> in-flight generation (see _schedule_generation)
+        self._inflight: Dict[Tuple[str, str], "asyncio.Task"] = {}
+        
+        # game_type -> batch generator (keys mirror SUPPORTED_GAME_TYPES)
+        self._dispatch = {
+            "swipe_sort": self._generate_swipe_sort_batch,
+            "impostor": self._generate_impostor_batch,
+            "match_pairs": self._generate_match_pairs_batch,
+        }
+        # game_type -> cross-field validator (see _validate_game_structure)
+        self._validators = {
+            "swipe_sort": self._validate_swipe_sort,
+            "impostor": self._validate_impostor,
+            "match_pairs": self._validate_match_pairs,
+        }
+        
+        # Render the static instructions now (once per process, memoized) so
+        # the first request per game type only formats its short tail.
+        for game_type in self._SUPPORTED_GAME_TYPES_LIST:
+            self._build_instruction(game_type)
+    
+    @property
+    def model(self):
+        """Shared Flash model, created on first use."""
+        if self._model is None:
+            self._model = _get_model()
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
     
     # ============================================================================
     # CORE PUBLIC INTERFACE
@@ -79,12 +547,21 @@ class GameMasterAgent(Agent):
         {
             "concept": str,           # Concept name (learner has understood this)
             "nuances": List[str],     # Edge cases, boundaries, weak points
-            "game_type": str          # One of: swipe_sort, impostor, match_pairs
+            "game_type": str,         # One of: swipe_sort, impostor, match_pairs
+            "service_tier": str,      # Optional: standard, priority (default: standard)
+            "use_cache": bool         # Optional (default True): reuse memoized games
         }
         
         OUTPUT CONTRACT:
         Frontend-ready JSON batch containing 2 games. No explanations, hints, or prose.
         
+        SERVICE TIERS:
+        - standard/priority: live gameplay, generated immediately. The pinned
+          Gemini SDKs expose no per-request tier, so both use the default tier.
+        - flex is rejected: Batch Mode jobs can take up to 24 hours, which no
+          request path can wait for. Pre-generation submits with
+          generate_batch_offline() and collects with collect_batch_offline().
+        
         ARCHITECTURAL GUARANTEES:
         - No teaching or explanations (that's Tutor Agent's job)
         - No answer evaluation (that's Evaluator Agent's job)
@@ -96,100 +573,224 @@ class GameMasterAgent(Agent):
         Games test boundaries, use subtle distractors, and require active thinking.
         Each game in the batch is unique and tests different aspects.
         """
-        game_type = input_data.get("game_type")
-        concept = input_data.get("concept", "")
-        nuances = input_data.get("nuances", [])
+        request = self._validate_input(input_data)
         
-        # Validate inputs
-        if game_type not in self.SUPPORTED_GAME_TYPES:
+        service_tier = self._validate_service_tier(input_data.get("service_tier") or self.DEFAULT_SERVICE_TIER)
+        if service_tier == "flex":
             raise ValueError(
-                f"Unsupported game_type '{game_type}'. "
-                f"Must be one of: {', '.join(self.SUPPORTED_GAME_TYPES)}"
+                "service_tier 'flex' is for offline pre-generation: "
+                "use generate_batch_offline() and collect_batch_offline()"
             )
         
-        if not concept or concept.strip() == "":
-            raise ValueError("Concept cannot be empty")
+        use_cache = bool(input_data.get("use_cache", True))
         
         # Route to specialized batch generator
-        if game_type == "swipe_sort":
-            return await self._generate_swipe_sort_batch(concept, nuances)
-        elif game_type == "impostor":
-            return await self._generate_impostor_batch(concept, nuances)
-        elif game_type == "match_pairs":
-            return await self._generate_match_pairs_batch(concept, nuances)
+        generate_batch = self._dispatch[request.game_type]
+        return await generate_batch(request.concept, request.nuances, use_cache)
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop all memoized games (tests, prompt changes)."""
+        cls._game_cache.clear()
+    
+    async def run_batch(self, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Generate game batches for many inputs through Gemini Batch Mode.
+        
+        WHY: Offline pre-generation (curriculum builds, evals) does not need
+        interactive latency. Batch Mode is billed at 50% of Standard pricing,
+        has much higher rate limits, and completes within 24 hours.
+        
+        INPUT CONTRACT:
+        List of run() inputs ({"concept", "nuances", "game_type"}).
+        
+        OUTPUT CONTRACT:
+        List of run()-shaped batch payloads, positionally matching `inputs`.
+        Batch Mode cannot re-prompt, so games that fail validation are dropped
+        and `total_games` reflects the games actually returned.
+        """
+        if not inputs:
+            return []
+        
+        job_name = await self.generate_batch_offline(inputs)
+        return await self.collect_batch_offline(job_name, inputs)
+    
+    async def generate_batch_offline(self, inputs: List[Dict[str, Any]]) -> str:
+        """
+        Submit a Gemini Batch Mode job for `inputs` and return its job name.
+        
+        WHY: Pre-generation workers should not hold a coroutine open for the
+        hours a batch can take. Persist the job name and pass it, with the
+        same `inputs`, to collect_batch_offline() later.
+        """
+        requests = [self._validate_input(input_data) for input_data in inputs]
+        if not requests:
+            raise ValueError("Batch inputs cannot be empty")
+        
+        instructions = {request.game_type: self._build_instruction(request.game_type) for request in requests}
+        
+        lines = []
+        for i, request in enumerate(requests):
+            for variation in range(1, self.GAMES_PER_BATCH + 1):
+                prompt = self._build_prompt(request.game_type, request.concept, request.nuances, variation)
+                lines.append(json.dumps({
+                    "key": f"req_{i}_{variation}",
+                    "request": {
+                        "system_instruction": {"parts": [{"text": instructions[request.game_type]}]},
+                        "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+                        "generation_config": self._generation_config(request.game_type),
+                    },
+                }))
+        
+        client = gemini_client()
+        src_file = await client.aio.files.upload(
+            file=io.BytesIO("\n".join(lines).encode("utf-8")),
+            config={"display_name": "gamemaster-batch", "mime_type": "jsonl"},
+        )
+        job = await client.aio.batches.create(
+            model=GEMINI_FLASH_MODEL,
+            src=src_file.name,
+            config={"display_name": "gamemaster-batch"},
+        )
+        return job.name
+    
+    async def collect_batch_offline(self, job_name: str, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Wait for a generate_batch_offline() job and return run_batch()-shaped results.
+        """
+        requests = [self._validate_input(input_data) for input_data in inputs]
+        
+        client = gemini_client()
+        job = await client.aio.batches.get(name=job_name)
+        while job.state.name not in self.BATCH_TERMINAL_STATES:
+            await asyncio.sleep(self.BATCH_POLL_INTERVAL_SECONDS)
+            job = await client.aio.batches.get(name=job.name)
+        
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            raise ValueError(f"Gemini batch job {job.name} ended in state {job.state.name}")
+        
+        raw_results = await client.aio.files.download(file=job.dest.file_name)
+        # The results file grows with the job (two full responses per input),
+        # so large ones are split and parsed off the event loop
+        if len(raw_results) > self.PARSE_OFFLOAD_THRESHOLD:
+            texts_by_key = await asyncio.to_thread(self._read_batch_results, raw_results)
+        else:
+            texts_by_key = self._read_batch_results(raw_results)
+        
+        texts, game_types, owners = [], [], []
+        for i, request in enumerate(requests):
+            for variation in range(1, self.GAMES_PER_BATCH + 1):
+                text = texts_by_key.get(f"req_{i}_{variation}")
+                if text:
+                    texts.append(text)
+                    game_types.append(request.game_type)
+                    owners.append(i)
+        
+        games_by_request = [[] for _ in requests]
+        for i, game in zip(owners, await self._parse_and_validate_batch(texts, game_types)):
+            if not isinstance(game, ValueError):
+                games_by_request[i].append(game)
+        
+        return [
+            {
+                "game_type": request.game_type,
+                "concept": request.concept,
+                "games": games,
+                "total_games": len(games)
+            }
+            for request, games in zip(requests, games_by_request)
+        ]
     
     
     # ============================================================================
     # HELPER METHODS
     # ============================================================================
     
-    def _format_nuance_guidance(self, nuances: List[str]) -> str:
+    @classmethod
+    def _validate_service_tier(cls, service_tier: str) -> str:
+        """Reject unknown service tiers (see run() SERVICE TIERS)."""
+        if service_tier not in cls.SERVICE_TIERS:
+            raise ValueError(
+                f"Unsupported service_tier '{service_tier}'. "
+                f"Must be one of: {', '.join(cls.SERVICE_TIERS)}"
+            )
+        return service_tier
+    
+    @classmethod
+    def _validate_input(cls, input_data: Dict[str, Any]) -> GameRequest:
         """
-        Format nuance list into guidance for game generation.
+        Validate a run() input and return it as a GameRequest.
         
-        WHY: Nuances represent edge cases, weak points, or boundaries that
-        should be prioritized in game generation for maximum learning value.
+        WHY: Shared by run() and run_batch() so both reject bad input the same
+        way, and before any prompt is built or LLM call is made.
         """
-        if not nuances or len(nuances) == 0:
-            return ""
+        if not isinstance(input_data, dict):
+            raise ValueError("Game input must be a JSON object")
         
-        # Limit to top 4 nuances to keep prompt focused
-        selected_nuances = nuances[:4]
-        formatted = "\n\nPRIORITY BOUNDARIES TO TEST:\n"
-        for i, nuance in enumerate(selected_nuances, 1):
-            formatted += f"   {i}. {nuance}\n"
+        game_type = input_data.get("game_type")
+        concept = input_data.get("concept")
+        nuances = input_data.get("nuances") or []
+        
+        if not isinstance(game_type, str) or game_type not in cls.SUPPORTED_GAME_TYPES:
+            raise ValueError(
+                f"Unsupported game_type '{game_type}'. "
+                f"Must be one of: {', '.join(cls._SUPPORTED_GAME_TYPES_LIST)}"
+            )
+        
+        if not isinstance(concept, str) or concept.strip() == "":
+            raise ValueError("Concept cannot be empty")
+        
+        if not isinstance(nuances, (list, tuple)) or not all(isinstance(n, str) for n in nuances):
+            raise ValueError("Nuances must be a list of strings")
         
-        return formatted
+        # Interned, game_type is the very object used as the key in every
+        # per-game-type table (specs, validators, dispatch), so those lookups
+        # and comparisons against literals resolve on identity.
+        return GameRequest(game_type=sys.intern(game_type), concept=concept, nuances=list(nuances))
     
-    def _clean_json_response(self, text: str) -> str:
+    def _read_batch_results(self, raw_results: bytes) -> Dict[str, str]:
+        """Map request key -> response text for a Batch Mode JSONL results file."""
+        texts_by_key = {}
+        # Result lines go to the parser as bytes; orjson reads UTF-8 directly
+        for line in raw_results.splitlines():
+            if line.strip():
+                key, text = self._read_batch_result_line(line)
+                texts_by_key[key] = text
+        return texts_by_key
+    
+    def _read_batch_result_line(self, line: bytes) -> Tuple[str, str]:
         """
-        Extract clean JSON from LLM response.
+        Extract (key, response text) from one Batch Mode JSONL result line.
         
-        WHY: LLMs often wrap JSON in markdown code blocks or add prose.
-        This ensures we get only the raw JSON for parsing.
+        Failed requests carry an "error" object instead of a "response";
+        those map to an empty string so the caller drops them.
         """
-        # Remove markdown code fences
-        text = re.sub(r'```json\s*', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'```\s*', '', text)
-        
-        # Remove common prose patterns before/after JSON
-        # (e.g., "Here is the game:", "Let me know if...")
-        text = re.sub(r'^[^{]*', '', text)  # Remove text before first {
-        text = re.sub(r'[^}]*$', '', text)  # Remove text after last }
-        
-        return text.strip()
+        record = _json_loads(line)
+        candidates = (record.get("response") or {}).get("candidates") or []
+        if not candidates:
+            return record.get("key", ""), ""
+        parts = (candidates[0].get("content") or {}).get("parts") or []
+        return record.get("key", ""), "".join(part.get("text", "") for part in parts)
     
-    def _parse_and_validate_json(self, raw_text: str, expected_game_type: str) -> Dict[str, Any]:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _format_nuance_guidance(nuances: Tuple[str, ...]) -> str:
         """
-        Parse LLM response into JSON and validate structure.
+        Format nuance list into guidance for game generation.
         
-        WHY: Ensures architectural contract is maintained - only valid,
-        frontend-ready JSON is returned, never malformed or partial data.
+        WHY: Nuances represent edge cases, weak points, or boundaries that
+        should be prioritized in game generation for maximum learning value.
+        
+        Memoized on the (hashable) top-4 tuple: every variation of a batch,
+        and every retry, formats the same nuances.
         """
-        try:
-            cleaned = self._clean_json_response(raw_text)
-            parsed = json.loads(cleaned)
-            
-            # Basic schema validation
-            if not isinstance(parsed, dict):
-                raise ValueError("Response is not a JSON object")
-            
-            if parsed.get("game_type") != expected_game_type:
-                raise ValueError(
-                    f"Expected game_type '{expected_game_type}', "
-                    f"got '{parsed.get('game_type')}'"
-                )
-            
-            return parsed
-            
-        except json.JSONDecodeError as e:
-            raise ValueError(
-                f"LLM returned invalid JSON. "
-                f"Parse error: {str(e)}. "
-                f"Raw response: {raw_text[:200]}"
-            ) from e
-
-    def _generate_valid_game(self, prompt: str, expected_game_type: str) -> Dict[str, Any]:
+        if not nuances:
+            return ""
+        
+        lines = [f"   {i}. {nuance}\n" for i, nuance in enumerate(nuances, 1)]
+        return _NUANCE_GUIDANCE_HEADER + "".join(lines)
+    
+    async def _generate_valid_game(self, prompt: str, expected_game_type: str) -> Dict[str, Any]:
         """Generate a single valid game JSON, retrying when the LLM output is malformed.
 
         WHY: Once we require answer keys + rationales, occasional LLM formatting drift
@@ -201,8 +802,7 @@ class GameMasterAgent(Agent):
         retry_prompt = prompt
         for attempt in range(1, self.MAX_GENERATION_ATTEMPTS + 1):
             try:
-                response = self.model.generate_content(retry_prompt)
-                return self._parse_and_validate_json(response.text, expected_game_type)
+                return await self._generate_hedged(retry_prompt, expected_game_type)
             except Exception as e:
                 last_error = e
                 # Add tight corrective instruction while keeping the original spec.
@@ -216,19 +816,216 @@ class GameMasterAgent(Agent):
 
         raise ValueError(f"Failed to generate valid '{expected_game_type}' game after {self.MAX_GENERATION_ATTEMPTS} attempts") from last_error
     
+    async def _generate_hedged(self, prompt: str, expected_game_type: str) -> Dict[str, Any]:
+        """
+        One generation attempt, hedged with a strict-JSON duplicate if it is slow.
+        
+        WHY: A stalled or drifting generation otherwise costs its full latency
+        before the retry loop can react. If the first request has not produced
+        a valid game after HEDGE_DELAY_SECONDS, a second request races it and
+        the first valid game wins. The delay sits near the tail of normal
+        generation time so typical calls never pay for a hedge, and a shared
+        semaphore caps concurrent hedges to avoid quota spikes.
+        """
+        async def attempt(attempt_prompt: str) -> Dict[str, Any]:
+            raw_text = await self._generate_content(expected_game_type, attempt_prompt)
+            return await self._parse_and_validate_json(raw_text, expected_game_type)
+        
+        pending = {asyncio.ensure_future(attempt(prompt))}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.HEDGE_DELAY_SECONDS)
+            if done or self._hedge_semaphore.locked():
+                return await next(iter(pending))
+            
+            async with self._hedge_semaphore:
+                pending.add(asyncio.ensure_future(attempt(prompt + _STRICT_JSON_SUFFIX)))
+                error: Exception | None = None
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            return task.result()
+                        error = task.exception()
+                raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    
+    async def _dedupe_games(self, game_type: str, concept: str, nuances: List[str], games: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Regenerate any game whose items duplicate an earlier game in the batch.
+        
+        WHY: Variations only differ by their variation number, and the model
+        sometimes returns the same items twice. A duplicate wastes the
+        learner's practice, so it is regenerated once with the items to
+        avoid spelled out, and the replacement is memoized in its place.
+        """
+        seen = set()
+        for i, game in enumerate(games):
+            fingerprint = _game_fingerprint(game)
+            if fingerprint in seen:
+                items = game.get(_GAME_ITEM_FIELDS[game_type]) or []
+                prompt = (
+                    self._build_prompt(game_type, concept, nuances, i + 1)
+                    + "\n\nIMPORTANT: Another game in this batch already uses these items; "
+                    + "do not reuse them: " + "; ".join(map(str, items))
+                )
+                game = await self._generate_valid_game(prompt, game_type)
+                _remember_game(_game_cache_key(game_type, concept, nuances, i + 1), game)
+                games[i] = copy.deepcopy(game)
+                fingerprint = _game_fingerprint(game)
+            seen.add(fingerprint)
+        return games
+    
+    async def _schedule_generation(self, prompt: str, game_type: str) -> Dict[str, Any]:
+        """
+        Generate a game, sharing the call with an identical in-flight prompt.
+        
+        WHY: Under load many learners request the same concept at once;
+        identical prompts (same concept, nuances and variation) share one
+        LLM call instead of racing the memoization cache. A prompt with no
+        twin in flight is sent immediately.
+        
+        Each waiter gets its own copy, and the shared task is shielded so
+        one cancelled waiter does not cancel it for the others.
+        """
+        key = (game_type, prompt)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_valid_game(prompt, game_type))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget_inflight, key))
+        
+        return copy.deepcopy(await asyncio.shield(task))
+    
+    def _forget_inflight(self, key: Tuple[str, str], task: "asyncio.Task") -> None:
+        """Drop a finished generation from the in-flight map."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the error retrieved: if every waiter was cancelled, nobody
+        # else awaits the task and asyncio would log it as never retrieved
+        if not task.cancelled():
+            task.exception()
+    
+    async def _generate_content(self, game_type: str, prompt: str) -> str:
+        """
+        Send a per-request prompt behind the game type's static instruction.
+        
+        WHY: The instruction (rules, anti-patterns, examples, output schema)
+        is ~90% of the tokens and identical on every call. Served from an
+        explicit context cache it is billed at the cached-token rate; without
+        one, keeping it as a byte-identical prefix still lets Gemini's
+        implicit caching apply.
+        """
+        model = await self._get_cached_model(game_type)
+        if model is None:
+            return await self._stream_json_text(
+                self.model, self._build_instruction(game_type) + "\n\n" + prompt, game_type
+            )
+        
+        try:
+            return await self._stream_json_text(model, prompt, game_type)
+        except Exception:
+            # Cache may have been evicted server-side; rebuild on next attempt
+            self._context_caches.invalidate(self._context_cache_name(game_type))
+            raise
+    
+    async def _stream_json_text(self, model, contents, game_type: str) -> str:
+        """
+        Stream a response and return its JSON object once it is complete.
+        
+        WHY: Scanning chunks as they arrive means parsing starts right after
+        the closing brace, and any trailing prose the model appends is never
+        waited for. The scan already knows the object's bounds, so the slice
+        goes straight to the strict parser with no separate cleaning pass,
+        and the stream is then cancelled (see _close_stream).
+        Incomplete output is returned whole for the lenient fallbacks.
+        """
+        response = await model.generate_content_async(
+            contents, generation_config=self._generation_config(game_type), stream=True
+        )
+        scanner = _JsonObjectScanner()
+        parts = []
+        chunks = response.__aiter__()
+        try:
+            async for chunk in chunks:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. the final finish_reason chunk)
+                    continue
+                parts.append(text)
+                if scanner.feed(text):
+                    return "".join(parts)[scanner.start:scanner.end]
+            return "".join(parts)
+        finally:
+            # Returning early must end the request, not just stop reading it
+            await _close_stream(response, chunks)
+    
+    async def _get_cached_model(self, game_type: str):
+        """
+        Return a model bound to a context cache of the game type's instruction,
+        or None while caching is unavailable (see ContextCacheManager).
+        """
+        return await self._context_caches.get(
+            self._context_cache_name(game_type), functools.partial(self._build_instruction, game_type)
+        )
+    
+    def _context_cache_name(self, game_type: str) -> str:
+        """Display name of the context cache for `game_type` (shared across processes)."""
+        return f"gamemaster-v{self.CONTEXT_CACHE_VERSION}-{game_type}"
+    
+    def _build_prompt(self, game_type: str, concept: str, nuances: List[str], variation: int) -> str:
+        """Build the per-request prompt for a game type."""
+        prompt_builders = {
+            "swipe_sort": self._build_swipe_sort_prompt,
+            "impostor": self._build_impostor_prompt,
+            "match_pairs": self._build_match_pairs_prompt,
+        }
+        return prompt_builders[game_type](concept, nuances, variation)
+    
+    def _generation_config(self, game_type: str) -> Dict[str, Any]:
+        """JSON-mode generation config, schema-constrained where expressible."""
+        schema = self.RESPONSE_SCHEMAS.get(game_type)
+        if schema is None:
+            return self.GENERATION_CONFIG
+        return {**self.GENERATION_CONFIG, "response_schema": schema}
+    
+    def _build_instruction(self, game_type: str) -> str:
+        """
+        Return the static system instruction for a game type.
+        
+        WHY: The instructions are ~5KB f-strings that only depend on class
+        constants, so each is rendered once per process and reused by every
+        call, cache refresh and batch line instead of being re-formatted.
+        """
+        instruction = GameMasterAgent._instructions.get(game_type)
+        if instruction is None:
+            instruction_builders = {
+                "swipe_sort": self._build_swipe_sort_instruction,
+                "impostor": self._build_impostor_instruction,
+                "match_pairs": self._build_match_pairs_instruction,
+            }
+            instruction = instruction_builders[game_type]()
+            GameMasterAgent._instructions[game_type] = instruction
+        return instruction
+    
     
     # ============================================================================
     # SWIPE-SORT GAME GENERATOR (Binary Classification with Boundary Focus)
     # ============================================================================
     
-    async def _generate_swipe_sort_batch(self, concept: str, nuances: List[str]) -> Dict[str, Any]:
+    async def _generate_swipe_sort_batch(self, concept: str, nuances: List[str], use_cache: bool = True) -> Dict[str, Any]:
         """
         Generate a batch of 2 swipe-sort games.
         """
-        games = []
-        for i in range(self.GAMES_PER_BATCH):
-            game = await self._generate_swipe_sort(concept, nuances, i + 1)
-            games.append(game)
+        # Variations are independent LLM calls, so run them concurrently
+        games = await asyncio.gather(*[
+            self._generate_swipe_sort(concept, nuances, i + 1, use_cache=use_cache)
+            for i in range(self.GAMES_PER_BATCH)
+        ])
+        games = await self._dedupe_games("swipe_sort", concept, nuances, games)
         
         return {
             "game_type": "swipe_sort",
@@ -237,6 +1034,7 @@ class GameMasterAgent(Agent):
             "total_games": self.GAMES_PER_BATCH
         }
     
+    @_memoized_game("swipe_sort")
     async def _generate_swipe_sort(self, concept: str, nuances: List[str], variation: int = 1) -> Dict[str, Any]:
         """
         Generate boundary-focused binary classification game.
@@ -252,11 +1050,26 @@ class GameMasterAgent(Agent):
             • Avoid trivial textbook examples
             • Items should require reasoning, not pattern matching
         
-        WHY ASYNC: Future-proofs for retry logic or quality checks
+        WHY ASYNC: Gemini calls are awaited, so concurrent requests overlap
+        on a single worker instead of blocking the event loop
         """
+        prompt = self._build_swipe_sort_prompt(concept, nuances, variation)
+        return await self._schedule_generation(prompt, "swipe_sort")
+    
+    def _build_swipe_sort_prompt(self, concept: str, nuances: List[str], variation: int = 1) -> str:
+        """Build the per-request swipe-sort prompt (pure; shared with run_batch)."""
         
-        # Build nuance context for prompt
-        nuance_guidance = self._format_nuance_guidance(nuances)
+        # Build nuance context for prompt (top 4 keeps the prompt focused)
+        nuance_guidance = self._format_nuance_guidance(tuple(nuances[:self.MAX_PROMPT_NUANCES]))
+        
+        return f"""Generate a swipe-left/swipe-right classification game for:
+
+CONCEPT: {concept}{nuance_guidance}
+
+Create UNIQUE items (variation #{variation} of this game type)."""
+    
+    def _build_swipe_sort_instruction(self) -> str:
+        """Build the invariant swipe-sort system instruction (see _get_cached_model)."""
         
         # ========================================================================
         # COGNITIVELY-ENGINEERED PROMPT
@@ -269,17 +1082,11 @@ class GameMasterAgent(Agent):
         
         prompt = f"""You are an expert educational game designer specializing in active-recall practice.
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-TASK: Binary Classification Game (Swipe-Sort)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-Generate a swipe-left/swipe-right classification game for:
+## TASK: Binary Classification Game (Swipe-Sort)
 
-CONCEPT: {concept}{nuance_guidance}
+Generate a swipe-left/swipe-right classification game for the CONCEPT given in the request.
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-COGNITIVE QUALITY REQUIREMENTS (MANDATORY)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## COGNITIVE QUALITY REQUIREMENTS (MANDATORY)
 
 1. CATEGORY DESIGN:
    • Must be true opposites or mutually exclusive groups
@@ -306,9 +1113,7 @@ COGNITIVE QUALITY REQUIREMENTS (MANDATORY)
    • Test understanding, not trivia
    • Avoid ambiguous wording
    
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-ANTI-PATTERNS (DO NOT GENERATE)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## ANTI-PATTERNS (DO NOT GENERATE)
 
 ❌ Obvious textbook examples (e.g., for "acid vs base": "Lemon juice", "Baking soda")
 ❌ Pattern-based items that don't test concept understanding
@@ -316,9 +1121,7 @@ ANTI-PATTERNS (DO NOT GENERATE)
 ❌ Surface-level distinctions (test deep properties, not labels)
 ❌ Repetitive phrasing across items
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-EXAMPLE: Binary Search Tree (Correct Operations vs Incorrect Operations)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## EXAMPLE: Binary Search Tree (Correct Operations vs Incorrect Operations)
 
 ✅ GOOD (Boundary-focused):
    • "Insert 5 into left subtree when parent is 7" (CORRECT - tests BST property)
@@ -330,16 +1133,14 @@ EXAMPLE: Binary Search Tree (Correct Operations vs Incorrect Operations)
    • "Insert smaller value to the left" (Too obvious - just states the rule)
    • "Insert larger value to the right" (Too obvious)
    
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-GENERATION INSTRUCTIONS
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## GENERATION INSTRUCTIONS
 
 1. Analyze the concept to identify natural opposing categories
 2. Generate {self.SWIPE_SORT_CARD_RANGE[0]}-{self.SWIPE_SORT_CARD_RANGE[1]} items
 3. Ensure 35%+ are boundary/edge cases
 4. Vary surface form and phrasing
 5. Make learner apply concept's core principle to classify
-6. Create UNIQUE items (variation #{variation} of this game type)
+6. Create UNIQUE items (the request gives the variation # of this game type)
 7. Output ONLY the JSON structure below (no prose, no markdown)
 
 OUTPUT FORMAT (STRICT):
@@ -359,23 +1160,23 @@ OUTPUT FORMAT (STRICT):
 }}
 
 CRITICAL: Return ONLY valid JSON. No explanations. No code blocks. No prose."""
-
-        response = self.model.generate_content(prompt)
-        return self._generate_valid_game(prompt, "swipe_sort")
+        return prompt
     
     
     # ============================================================================
     # IMPOSTOR GAME GENERATOR (Subtle Boundary Discrimination)
     # ============================================================================
     
-    async def _generate_impostor_batch(self, concept: str, nuances: List[str]) -> Dict[str, Any]:
+    async def _generate_impostor_batch(self, concept: str, nuances: List[str], use_cache: bool = True) -> Dict[str, Any]:
         """
         Generate a batch of 2 impostor games.
         """
-        games = []
-        for i in range(self.GAMES_PER_BATCH):
-            game = await self._generate_impostor(concept, nuances, i + 1)
-            games.append(game)
+        # Variations are independent LLM calls, so run them concurrently
+        games = await asyncio.gather(*[
+            self._generate_impostor(concept, nuances, i + 1, use_cache=use_cache)
+            for i in range(self.GAMES_PER_BATCH)
+        ])
+        games = await self._dedupe_games("impostor", concept, nuances, games)
         
         return {
             "game_type": "impostor",
@@ -384,6 +1185,7 @@ CRITICAL: Return ONLY valid JSON. No explanations. No code blocks. No prose."""
             "total_games": self.GAMES_PER_BATCH
         }
     
+    @_memoized_game("impostor")
     async def _generate_impostor(self, concept: str, nuances: List[str], variation: int = 1) -> Dict[str, Any]:
         """
         Generate "find the impostor" game with subtle outlier detection.
@@ -402,22 +1204,31 @@ CRITICAL: Return ONLY valid JSON. No explanations. No code blocks. No prose."""
         WHY 3+1: Three genuine items establish pattern, impostor tests if
         learner truly understands what makes something belong.
         """
+        prompt = self._build_impostor_prompt(concept, nuances, variation)
+        return await self._schedule_generation(prompt, "impostor")
+    
+    def _build_impostor_prompt(self, concept: str, nuances: List[str], variation: int = 1) -> str:
+        """Build the per-request impostor prompt (pure; shared with run_batch)."""
         
-        nuance_guidance = self._format_nuance_guidance(nuances)
+        # Limit to top 4 nuances to keep prompt focused
+        nuance_guidance = self._format_nuance_guidance(tuple(nuances[:self.MAX_PROMPT_NUANCES]))
         
-        prompt = f"""You are an expert educational game designer specializing in boundary testing.
+        return f"""Generate a "spot the impostor" game for:
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-TASK: Find-the-Impostor Game (Subtle Outlier Detection)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CONCEPT: {concept}{nuance_guidance}
 
-Generate a "spot the impostor" game for:
+Create UNIQUE options (variation #{variation} of this game type)."""
+    
+    def _build_impostor_instruction(self) -> str:
+        """Build the invariant impostor system instruction (see _get_cached_model)."""
+        
+        prompt = f"""You are an expert educational game designer specializing in boundary testing.
 
-CONCEPT: {concept}{nuance_guidance}
+## TASK: Find-the-Impostor Game (Subtle Outlier Detection)
+
+Generate a "spot the impostor" game for the CONCEPT given in the request.
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-COGNITIVE QUALITY REQUIREMENTS (MANDATORY)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## COGNITIVE QUALITY REQUIREMENTS (MANDATORY)
 
 1. STRUCTURE:
    • Generate exactly {self.IMPOSTOR_OPTIONS_COUNT} options
@@ -442,9 +1253,7 @@ COGNITIVE QUALITY REQUIREMENTS (MANDATORY)
    • Learner must think "wait, which one doesn't belong?"
    • Detection requires applying conceptual understanding
    
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-ANTI-PATTERNS (DO NOT GENERATE)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## ANTI-PATTERNS (DO NOT GENERATE)
 
 ❌ Impostor that is obviously unrelated (e.g., for "sorting algorithms": "Rainbow")
 ❌ Surface-level impostors (different by label only, not by principle)
@@ -452,9 +1261,7 @@ ANTI-PATTERNS (DO NOT GENERATE)
 ❌ All genuine options that are too similar (no variety)
 ❌ Generic textbook examples
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-EXAMPLE: Binary Search Trees (Property Violations)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## EXAMPLE: Binary Search Trees (Property Violations)
 
 ✅ GOOD (Subtle impostor):
    Options:
@@ -475,15 +1282,13 @@ EXAMPLE: Binary Search Trees (Property Violations)
    
    WHY BAD: Impostor is trivially different. No boundary testing.
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-GENERATION INSTRUCTIONS
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## GENERATION INSTRUCTIONS
 
 1. Identify the core principle/boundary of the concept
 2. Create 3 genuine examples that clearly fit
 3. Create 1 impostor that SUBTLY violates the principle
 4. Ensure impostor shares surface similarities with genuine options
-5. Create UNIQUE options (variation #{variation} of this game type)
+5. Create UNIQUE options (the request gives the variation # of this game type)
 6. Output ONLY the JSON structure below (no prose, no markdown)
 
 OUTPUT FORMAT (STRICT):
@@ -495,23 +1300,23 @@ OUTPUT FORMAT (STRICT):
 }}
 
 CRITICAL: Return ONLY valid JSON. No explanations. No code blocks. No prose."""
-
-        response = self.model.generate_content(prompt)
-        return self._generate_valid_game(prompt, "impostor")
+        return prompt
     
     
     # ============================================================================
     # MATCH-PAIRS GAME GENERATOR (Relational Understanding)
     # ============================================================================
     
-    async def _generate_match_pairs_batch(self, concept: str, nuances: List[str]) -> Dict[str, Any]:
+    async def _generate_match_pairs_batch(self, concept: str, nuances: List[str], use_cache: bool = True) -> Dict[str, Any]:
         """
         Generate a batch of 2 match-pairs games.
         """
-        games = []
-        for i in range(self.GAMES_PER_BATCH):
-            game = await self._generate_match_pairs(concept, nuances, i + 1)
-            games.append(game)
+        # Variations are independent LLM calls, so run them concurrently
+        games = await asyncio.gather(*[
+            self._generate_match_pairs(concept, nuances, i + 1, use_cache=use_cache)
+            for i in range(self.GAMES_PER_BATCH)
+        ])
+        games = await self._dedupe_games("match_pairs", concept, nuances, games)
         
         return {
             "game_type": "match_pairs",
@@ -520,6 +1325,7 @@ CRITICAL: Return ONLY valid JSON. No explanations. No code blocks. No prose."""
             "total_games": self.GAMES_PER_BATCH
         }
     
+    @_memoized_game("match_pairs")
     async def _generate_match_pairs(self, concept: str, nuances: List[str], variation: int = 1) -> Dict[str, Any]:
         """
         Generate term-association matching game testing relational understanding.
@@ -538,22 +1344,31 @@ CRITICAL: Return ONLY valid JSON. No explanations. No code blocks. No prose."""
         WHY KEY-VALUE PAIRS: Simplifies frontend (left column / right column)
         while testing associative recall.
         """
+        prompt = self._build_match_pairs_prompt(concept, nuances, variation)
+        return await self._schedule_generation(prompt, "match_pairs")
+    
+    def _build_match_pairs_prompt(self, concept: str, nuances: List[str], variation: int = 1) -> str:
+        """Build the per-request match-pairs prompt (pure; shared with run_batch)."""
         
-        nuance_guidance = self._format_nuance_guidance(nuances)
+        # Limit to top 4 nuances to keep prompt focused
+        nuance_guidance = self._format_nuance_guidance(tuple(nuances[:self.MAX_PROMPT_NUANCES]))
         
-        prompt = f"""You are an expert educational game designer specializing in relational learning.
+        return f"""Generate a matching pairs game for:
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-TASK: Match-Pairs Game (Relational/Functional Association)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CONCEPT: {concept}{nuance_guidance}
 
-Generate a matching pairs game for:
+Create UNIQUE pairs (variation #{variation} of this game type)."""
+    
+    def _build_match_pairs_instruction(self) -> str:
+        """Build the invariant match-pairs system instruction (see _get_cached_model)."""
+        
+        prompt = f"""You are an expert educational game designer specializing in relational learning.
 
-CONCEPT: {concept}{nuance_guidance}
+## TASK: Match-Pairs Game (Relational/Functional Association)
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-COGNITIVE QUALITY REQUIREMENTS (MANDATORY)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Generate a matching pairs game for the CONCEPT given in the request.
+
+## COGNITIVE QUALITY REQUIREMENTS (MANDATORY)
 
 1. PAIR TYPE PRIORITIES (in order):
    🥇 FUNCTIONAL relationships (what it DOES, how it WORKS)
@@ -579,9 +1394,7 @@ COGNITIVE QUALITY REQUIREMENTS (MANDATORY)
    • Ensure matches are unambiguous when concept is understood
    • Make wrong pairings obviously incorrect (for frontend scrambling)
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-ANTI-PATTERNS (DO NOT GENERATE)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## ANTI-PATTERNS (DO NOT GENERATE)
 
 ❌ Generic definitions:
    "Algorithm" → "A step-by-step procedure" (too vague)
@@ -592,9 +1405,7 @@ ANTI-PATTERNS (DO NOT GENERATE)
 ❌ Obvious vocabulary:
    "Tree" → "A data structure with nodes" (obvious from term itself)
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-EXAMPLE: Binary Search Trees (Functional & Relational)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## EXAMPLE: Binary Search Trees (Functional & Relational)
 
 ✅ GOOD (Functional/Relational):
 {{
@@ -617,15 +1428,13 @@ WHY GOOD: Tests understanding of HOW things work and RELATE, not just WHAT they
 
 WHY BAD: Doesn't test concept understanding. Could be guessed or memorized.
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-GENERATION INSTRUCTIONS
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+## GENERATION INSTRUCTIONS
 
 1. Identify key technical terms from the concept
 2. Create functional/relational associations (not just definitions)
 3. Ensure associations test understanding, not memorization
 4. Use precise, specific language
-5. Create UNIQUE pairs (variation #{variation} of this game type)
+5. Create UNIQUE pairs (the request gives the variation # of this game type)
 6. Output ONLY the JSON structure below (no prose, no markdown)
 
 OUTPUT FORMAT (STRICT):
@@ -644,9 +1453,7 @@ OUTPUT FORMAT (STRICT):
 }}
 
 CRITICAL: Return ONLY valid JSON. No explanations. No code blocks. No prose."""
-
-        response = self.model.generate_content(prompt)
-        return self._generate_valid_game(prompt, "match_pairs")
+        return prompt
     
     # ============================================================================
     # JSON PARSING & VALIDATION
@@ -660,57 +1467,110 @@ CRITICAL: Return ONLY valid JSON. No explanations. No code blocks. No prose."""
         This ensures we get only the raw JSON for parsing, maintaining
         the architectural contract of structured output only.
         """
-        # Remove markdown code fences
-        text = re.sub(r'```json\s*', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'```\s*', '', text)
+        # Markdown fences and prose ("Here is the game:", "Let me know if...")
+        # sit outside the object, so slicing out the object drops them too.
+        return _find_json_object(text)
+    
+    async def _parse_and_validate_json(self, raw_text: Union[str, bytes], expected_game_type: str) -> Dict[str, Any]:
+        """
+        Parse and validate an LLM response without stalling the event loop.
         
-        # Remove common prose patterns before/after JSON
-        # (e.g., "Here is the game:", "Let me know if...")
-        text = re.sub(r'^[^{]*', '', text)  # Remove text before first {
-        text = re.sub(r'[^}]*$', '', text)  # Remove text after last }
+        WHY: Small responses parse in microseconds and stay inline. Large ones
+        (multi-KB match_pairs, prose-wrapped output needing cleanup) go to a
+        worker thread so concurrent agents keep being served.
+        """
+        if len(raw_text) > self.PARSE_OFFLOAD_THRESHOLD:
+            return await asyncio.to_thread(
+                self._parse_and_validate_json_sync, raw_text, expected_game_type
+            )
+        return self._parse_and_validate_json_sync(raw_text, expected_game_type)
+    
+    async def _parse_and_validate_batch(
+        self, raw_texts: List[Union[str, bytes]], expected_game_types: List[str]
+    ) -> List[Union[Dict[str, Any], ValueError]]:
+        """
+        Parse and validate many responses, keeping their order.
         
-        return text.strip()
+        WHY: A Batch Mode job returns every response at once. Validating them
+        in one loop (and one worker-thread hop once the batch is large) beats
+        a to_thread round-trip per response. Invalid responses come back as
+        their ValueError, like gather(return_exceptions=True), so one bad
+        response does not sink the rest.
+        """
+        if sum(map(len, raw_texts)) > self.PARSE_OFFLOAD_THRESHOLD:
+            return await asyncio.to_thread(
+                self._parse_and_validate_batch_sync, raw_texts, expected_game_types
+            )
+        return self._parse_and_validate_batch_sync(raw_texts, expected_game_types)
     
-    def _parse_and_validate_json(self, raw_text: str, expected_game_type: str) -> Dict[str, Any]:
+    def _parse_and_validate_batch_sync(
+        self, raw_texts: List[Union[str, bytes]], expected_game_types: List[str]
+    ) -> List[Union[Dict[str, Any], ValueError]]:
+        parse = self._parse_and_validate_json_sync
+        results = []
+        for raw_text, expected_game_type in zip(raw_texts, expected_game_types):
+            try:
+                results.append(parse(raw_text, expected_game_type))
+            except ValueError as e:
+                results.append(e)
+        return results
+    
+    def _parse_and_validate_json_sync(self, raw_text: Union[str, bytes], expected_game_type: str) -> Dict[str, Any]:
         """
         Parse LLM response into JSON and validate structure.
         
         WHY: Ensures architectural contract is maintained - only valid,
         frontend-ready JSON is returned, never malformed or partial data.
         
+        Accepts UTF-8 bytes as well as str: the strict parser reads bytes
+        directly, and they are only decoded if cleaning is needed.
+        
         VALIDATION:
         - Parses as valid JSON
         - Contains expected game_type
         - Has required fields for that game type
         
         RAISES:
-        ValueError if response is invalid or malformed
+        ValueError if response is invalid or malformed (LLMJsonError if unparseable)
         """
         try:
+            # JSON mode returns bare JSON, so the common case skips cleaning.
+            parsed = _json_loads(raw_text)
+        except (json.JSONDecodeError, UnicodeDecodeError) as strict_error:
+            if isinstance(raw_text, bytes):
+                raw_text = raw_text.decode("utf-8", errors="replace")
             cleaned = self._clean_json_response(raw_text)
-            parsed = json.loads(cleaned)
-            
-            # Basic schema validation
-            if not isinstance(parsed, dict):
-                raise ValueError("Response is not a JSON object")
-            
-            if parsed.get("game_type") != expected_game_type:
-                raise ValueError(
-                    f"Expected game_type '{expected_game_type}', "
-                    f"got '{parsed.get('game_type')}'"
-                )
-            
-            # Game-specific validation
-            self._validate_game_structure(parsed, expected_game_type)
-            
-            return parsed
-            
-        except json.JSONDecodeError as e:
+            try:
+                if cleaned == raw_text and isinstance(strict_error, json.JSONDecodeError):
+                    # Nothing was stripped, so a second strict parse would fail the same way
+                    raise strict_error
+                parsed = _json_loads(cleaned)
+            except json.JSONDecodeError as e:
+                if len(cleaned) <= _LENIENT_CACHE_MAX_CHARS:
+                    strict_text = _lenient_json_text(cleaned)
+                else:
+                    strict_text = _lenient_json_text.__wrapped__(cleaned)
+                if strict_text is None:
+                    raise LLMJsonError(raw_text, e) from e
+                parsed = _json_loads(strict_text)
+        
+        # Basic schema validation
+        # Parsers only ever build plain dicts/lists, so exact type checks
+        # (a pointer compare, no MRO walk) are safe here and in validation.
+        if type(parsed) is not dict:
+            raise ValueError("Response is not a JSON object")
+        
+        game_type = parsed.get("game_type")
+        if game_type != expected_game_type:
             raise ValueError(
-                f"LLM returned invalid JSON. "
-                f"Parse error: {str(e)}. "
-                f"Raw response: {raw_text[:200]}"
-            ) from e
+                f"Expected game_type '{expected_game_type}', "
+                f"got '{game_type}'"
+            )
+        
+        # Game-specific validation
+        self._validate_game_structure(parsed, expected_game_type)
+        
+        return parsed
     
     def _validate_game_structure(self, game_data: Dict[str, Any], game_type: str):
         """
@@ -719,75 +1579,82 @@ CRITICAL: Return ONLY valid JSON. No explanations. No code blocks. No prose."""
         WHY: Prevents malformed games from reaching the frontend.
         Catches LLM failures early with clear error messages.
         """
-        if game_type == "swipe_sort":
-            required_fields = ["left_category", "right_category", "cards", "answer_key", "why"]
-            for field in required_fields:
-                if field not in game_data:
-                    raise ValueError(f"Swipe-sort game missing required field: {field}")
-            
-            if not isinstance(game_data["cards"], list):
-                raise ValueError("Swipe-sort 'cards' must be a list")
-
-            if not isinstance(game_data["answer_key"], dict):
-                raise ValueError("Swipe-sort 'answer_key' must be an object mapping card->left/right")
-
-            if not isinstance(game_data["why"], dict):
-                raise ValueError("Swipe-sort 'why' must be an object mapping card->rationale")
-            
-            if not (self.SWIPE_SORT_CARD_RANGE[0] <= len(game_data["cards"]) <= self.SWIPE_SORT_CARD_RANGE[1]):
-                raise ValueError(
-                    f"Swipe-sort must have {self.SWIPE_SORT_CARD_RANGE[0]}-{self.SWIPE_SORT_CARD_RANGE[1]} cards, "
-                    f"got {len(game_data['cards'])}"
-                )
-
-            # Ensure answer_key/why cover every card.
-            for card in game_data["cards"]:
-                side = game_data["answer_key"].get(card)
-                if side not in ("left", "right"):
-                    raise ValueError("Swipe-sort answer_key must map every card to 'left' or 'right'")
-                if not isinstance(game_data["why"].get(card), str) or not game_data["why"].get(card):
-                    raise ValueError("Swipe-sort why must include a non-empty rationale for every card")
-        
-        elif game_type == "impostor":
-            required_fields = ["options", "impostor", "why"]
-            for field in required_fields:
-                if field not in game_data:
-                    raise ValueError(f"Impostor game missing required field: {field}")
-            
-            if not isinstance(game_data["options"], list):
-                raise ValueError("Impostor 'options' must be a list")
-            
-            if len(game_data["options"]) != self.IMPOSTOR_OPTIONS_COUNT:
-                raise ValueError(
-                    f"Impostor game must have exactly {self.IMPOSTOR_OPTIONS_COUNT} options, "
-                    f"got {len(game_data['options'])}"
-                )
-            
-            if game_data["impostor"] not in game_data["options"]:
-                raise ValueError("Impostor must be one of the options")
-
-            if not isinstance(game_data["why"], str) or not game_data["why"].strip():
-                raise ValueError("Impostor 'why' must be a non-empty string")
+        spec = _GAME_SPECS.get(game_type)
+        if spec is None:
+            raise ValueError(f"Unknown game_type: {game_type}")
+        missing = spec.required.difference(game_data)
+        if missing:
+            raise ValueError(
+                f"{spec.label} game missing required fields: {', '.join(sorted(missing))}"
+            )
+        for field, expected_type, message in spec.type_checks:
+            if type(game_data[field]) is not expected_type:
+                raise ValueError(f"{spec.label} {message}")
         
-        elif game_type == "match_pairs":
-            if "pairs" not in game_data:
-                raise ValueError("Match-pairs game missing 'pairs' field")
-            
-            if not isinstance(game_data["pairs"], dict):
-                raise ValueError("Match-pairs 'pairs' must be a dictionary")
+        self._validators[game_type](game_data)
+    
+    def _validate_swipe_sort(self, game_data: Dict[str, Any]):
+        """
+        Sizes and answer_key/why coverage of a shape-checked swipe-sort game.
+        
+        Keys for cards not in the deck are dropped rather than rejected: the
+        frontend only reads the cards' entries, and a retry for them would
+        cost a full generation.
+        """
+        cards = game_data["cards"]
+        answer_key = game_data["answer_key"]
+        why = game_data["why"]
+        count = len(cards)
+        low, high = self.SWIPE_SORT_CARD_RANGE
+        if not low <= count <= high:
+            raise ValueError(f"Swipe-sort must have {low}-{high} cards, got {count}")
 
-            if "why" not in game_data:
-                raise ValueError("Match-pairs game missing 'why' field")
+        # answer_key/why must cover every card: one set comparison each.
+        # Unhashable cards or sides (lists/objects from the LLM) surface as
+        # TypeError.
+        try:
+            card_set = frozenset(cards)
+            if not card_set <= answer_key.keys():
+                raise ValueError("Swipe-sort answer_key must map every card to 'left' or 'right'")
+            if answer_key.keys() != card_set:
+                answer_key = game_data["answer_key"] = {card: answer_key[card] for card in cards}
+            if not _SWIPE_SIDES.issuperset(answer_key.values()):
+                raise ValueError("Swipe-sort answer_key must map every card to 'left' or 'right'")
+        except TypeError:
+            raise ValueError("Swipe-sort cards and answer_key values must be strings") from None
+        if not card_set <= why.keys():
+            raise ValueError("Swipe-sort why must include a non-empty rationale for every card")
+        if why.keys() != card_set:
+            why = game_data["why"] = {card: why[card] for card in cards}
+        for reason in why.values():
+            if type(reason) is not str or not reason:
+                raise ValueError("Swipe-sort why must include a non-empty rationale for every card")
+    
+    def _validate_impostor(self, game_data: Dict[str, Any]):
+        """Option count, membership and rationale of a shape-checked impostor game."""
+        options = game_data["options"]
+        why = game_data["why"]
+        count = len(options)
+        if count != self.IMPOSTOR_OPTIONS_COUNT:
+            raise ValueError(
+                f"Impostor game must have exactly {self.IMPOSTOR_OPTIONS_COUNT} options, got {count}"
+            )
+        
+        if game_data["impostor"] not in options:
+            raise ValueError("Impostor must be one of the options")
 
-            if not isinstance(game_data["why"], dict):
-                raise ValueError("Match-pairs 'why' must be a dictionary mapping term->rationale")
-            
-            if not (self.MATCH_PAIRS_RANGE[0] <= len(game_data["pairs"]) <= self.MATCH_PAIRS_RANGE[1]):
-                raise ValueError(
-                    f"Match-pairs must have {self.MATCH_PAIRS_RANGE[0]}-{self.MATCH_PAIRS_RANGE[1]} pairs, "
-                    f"got {len(game_data['pairs'])}"
-                )
+        if type(why) is not str or not why.strip():
+            raise ValueError("Impostor 'why' must be a non-empty string")
+    
+    def _validate_match_pairs(self, game_data: Dict[str, Any]):
+        """Pair count and per-term rationale of a shape-checked match-pairs game."""
+        pairs = game_data["pairs"]
+        why = game_data["why"]
+        count = len(pairs)
+        low, high = self.MATCH_PAIRS_RANGE
+        if not low <= count <= high:
+            raise ValueError(f"Match-pairs must have {low}-{high} pairs, got {count}")
 
-            for term in game_data["pairs"].keys():
-                if not isinstance(game_data["why"].get(term), str) or not game_data["why"].get(term):
-                    raise ValueError("Match-pairs why must include a non-empty rationale for every term")
+        for term in pairs:
+            if type(reason := why.get(term)) is not str or not reason:
+                raise ValueError("Match-pairs why must include a non-empty rationale for every term")
@@ -31,15 +31,223 @@ DOES NOT (ARCHITECTURAL BOUNDARIES):
     - Perform reasoning or inferenceThink like a LIBRARIAN cataloging a book, not a TEACHER explaining it.
 """
 
+import asyncio
 import base64
+import functools
+import hashlib
+import logging
 import re
+import sys
+import threading
+from collections import OrderedDict
 from io import BytesIO
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional, Pattern
 from PIL import Image
+from pydantic import ValidationError
+from pydantic_core import from_json
 
 from core.agent_base import Agent
 from core.ingestion_schema import IngestionResult
-from services.gemini_client import gemini_flash
+from services import ingestion_cache
+from services.file_loader import extract_pdf_text
+from services.gemini_client import ContextCacheManager, gemini_flash
+
+
+logger = logging.getLogger(__name__)
+
+
+# Chunking boundaries (see IngestionAgent._intelligent_chunk)
+_PAGE_MARKER_RE = re.compile(r'---\s*Page\s+\d+\s*---', re.IGNORECASE)
+_PAGE_SPLIT_RE = re.compile(r'\n?---\s*Page\s+\d+\s*---\n?', re.IGNORECASE)
+_SECTION_SPLIT_RE = re.compile(r'\n(?=#{1,3} )')
+
+
+@functools.lru_cache(maxsize=1)
+def _get_model():
+    """
+    Flash model shared by every IngestionAgent in the process.
+    
+    WHY: main.py and the orchestrator each hold an agent, and the uncached
+    fallback path should not pay SDK model setup once per instance.
+    """
+    return gemini_flash()
+
+
+def _decode_image(base64_content: str, draft_size: int) -> Image.Image:
+    """Decode a base64 upload into a fully loaded PIL image (blocking)."""
+    try:
+        image_data = base64.b64decode(base64_content)
+        image = Image.open(BytesIO(image_data))
+        # WHY: Gemini downscales large images anyway; draft() lets the JPEG
+        # decoder skip straight to a reduced scale (never below the bound)
+        # instead of decoding a full-resolution photo. No-op for other formats.
+        image.draft(image.mode, (draft_size, draft_size))
+        # Decode now so the raw bytes can be released before the LLM call
+        image.load()
+        del image_data
+        # WHY: Larger images are downscaled by Gemini regardless; shrinking
+        # here cuts the bytes the SDK re-encodes and uploads per call
+        image.thumbnail((draft_size, draft_size), Image.Resampling.LANCZOS)
+    except Exception as e:
+        raise ValueError(f"Failed to decode image: {str(e)}")
+    
+    return image
+
+
+# Recently decoded uploads, keyed by digest (see _decode_image_cached)
+_DECODED_IMAGE_CACHE_SIZE = 2
+_decoded_images: "OrderedDict[bytes, Image.Image]" = OrderedDict()
+_decoded_images_lock = threading.Lock()
+
+
+def _decode_image_cached(base64_content: str, draft_size: int) -> Image.Image:
+    """
+    _decode_image, reusing the result for a recently seen upload (blocking).
+    
+    WHY: Clients retry failed ingestions with the same upload. Keying on a
+    digest keeps no multi-MB upload strings alive, only the last few
+    (already downscaled) images, and every caller gets its own copy to
+    mutate. Failed decodes are not cached.
+    """
+    key = hashlib.blake2b(
+        f"{draft_size}\0{base64_content}".encode("utf-8"), digest_size=16
+    ).digest()
+    with _decoded_images_lock:
+        image = _decoded_images.get(key)
+        if image is not None:
+            _decoded_images.move_to_end(key)
+            return image.copy()
+    
+    image = _decode_image(base64_content, draft_size)
+    with _decoded_images_lock:
+        _decoded_images[key] = image
+        while len(_decoded_images) > _DECODED_IMAGE_CACHE_SIZE:
+            _decoded_images.popitem(last=False)
+    return image.copy()
+
+
+def _is_blank(text: str) -> bool:
+    """`not text.strip()` without copying text (isspace stops at the first non-space)."""
+    return not text or text.isspace()
+
+
+def _is_truncated_json(error: ValidationError) -> bool:
+    """True when validation failed because the JSON ends mid-value (output cut off)."""
+    return any(
+        err["type"] == "json_invalid" and "EOF while parsing" in err["msg"]
+        for err in error.errors()
+    )
+
+
+def _iter_split(pattern: Pattern, text: str) -> Iterator[str]:
+    """
+    Lazily yield the pieces `pattern.split(text)` would return.
+    
+    WHY: Chunking walks each piece once. Slicing between matches as we go
+    keeps only the piece in hand alive instead of a list covering the whole
+    (possibly tens of MB) document next to the document itself.
+    """
+    start = 0
+    for match in pattern.finditer(text):
+        yield text[start:match.start()]
+        start = match.end()
+    yield text[start:]
+
+
+def _iter_paragraphs(text: str) -> Iterator[str]:
+    """Lazily yield the pieces `text.split("\n\n")` would return."""
+    start = 0
+    end = text.find("\n\n")
+    while end >= 0:
+        yield text[start:end]
+        start = end + 2
+        end = text.find("\n\n", start)
+    yield text[start:]
+
+
+# Name of a "## N. Section Name:" header line (numbering and colon optional)
+_HEADER_RE = re.compile(r'#{2,}\s*(?:\d+\.\s*)?(.*?)[\s:]*$')
+
+# List markers stripped from extracted section items
+_BULLET_CHARS = "-•*✓"
+
+# Prompt placeholders the model sometimes echoes back as items
+_META_LINES = frozenset(('(bullet list)', '(if present)', '(one per line)'))
+
+
+def _strip_number_marker(text: str) -> str:
+    """Drop a leading "12." list number and the whitespace after it."""
+    end = 0
+    while end < len(text) and text[end].isdecimal():
+        end += 1
+    if end and text[end:end + 1] == '.':
+        return text[end + 1:].lstrip()
+    return text
+
+
+# Result items shorter than this are interned by _dedupe_items
+_INTERN_ITEM_MAX_CHARS = 64
+
+
+def _strip_item(item: str) -> str:
+    """
+    Strip one result item, interning it if short.
+    
+    WHY: Short items (concept names, terms) recur across ingestions and are
+    held by every session that ingested them; interning stores each text once.
+    """
+    item = item.strip()
+    return sys.intern(item) if len(item) < _INTERN_ITEM_MAX_CHARS else item
+
+
+def _dedupe_items(items: List[str], fold_case: bool = False) -> List[str]:
+    """
+    Strip items and drop empty ones and repeats, keeping first occurrences in order.
+    
+    With fold_case, items differing only in case count as repeats; the
+    first spelling is kept.
+    """
+    if not fold_case:
+        return list(dict.fromkeys(item for item in map(_strip_item, items) if item))
+    seen = set()
+    unique = []
+    for item in map(_strip_item, items):
+        key = item.casefold()
+        if item and key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+
+# Per-call prompts. The extraction instructions go to Gemini separately (see
+# IngestionAgent._build_instruction); these carry only the input itself.
+_TEXT_PROMPT_TMPL = """━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+INPUT CONTENT
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+{content}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Begin extraction now. Output ONLY the structured format above."""
+
+_CHUNK_PROMPT_TMPL = """CONTEXT: This is chunk {part} of {total} from a multi-part document.
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CHUNK CONTENT
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+{chunk}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Begin extraction now. Output ONLY the structured format above."""
+
+# The image goes to Gemini behind the cached image instruction; this is the
+# only text that accompanies it
+_IMAGE_PROMPT_TAIL = """━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Begin extraction now. Output ONLY the structured format above."""
 
 
 class IngestionAgent(Agent):
@@ -59,9 +267,20 @@ class IngestionAgent(Agent):
     # to leave room for prompt overhead and response generation
     MAX_CHUNK_SIZE = 750000  # characters (~190k tokens with safety margin)
     
+    # WHY: Fraction of each hard-split chunk (strategy 4 of _intelligent_chunk)
+    # repeated at the start of the next one, so a concept straddling a
+    # boundary is seen whole at least once. Costs about OVERLAP_RATIO extra
+    # input tokens, and only for documents with no page, section or
+    # paragraph breaks to split on.
+    OVERLAP_RATIO = 0.1
+    
     # WHY: Minimum content threshold prevents silent failures
     MIN_OUTPUT_LENGTH = 100  # characters
     
+    # WHY: Bound on image edges sent to Gemini; JPEGs are also decoded at a
+    # reduced scale down to it (see _decode_image)
+    IMAGE_DRAFT_SIZE = 2048
+    
     # WHY: Section headers must be exact for reliable extraction
     SECTION_HEADERS = {
         "concepts": "Core Concepts",
@@ -71,9 +290,63 @@ class IngestionAgent(Agent):
         "markdown": "Clean Markdown Notes"
     }
     
+    # Sections parsed into item lists (markdown is kept whole)
+    LIST_SECTIONS = ("concepts", "definitions", "examples", "diagrams")
+    
+    # Casefolded header names; a label naming another section ends the
+    # section being collected (see _scan_sections)
+    _SECTION_NAMES = frozenset(header.casefold() for header in SECTION_HEADERS.values())
+    
+    # Explicit context caches for the static extraction instructions (one
+    # per kind: "text", "image", "chunk"). Bump CONTEXT_CACHE_VERSION whenever
+    # an instruction changes: caches are shared across processes by display
+    # name (ingestion-v{N}-{kind}).
+    CONTEXT_CACHE_VERSION = 2
+    CONTEXT_CACHE_TTL_SECONDS = 7200
+    CONTEXT_CACHE_REFRESH_MARGIN_SECONDS = 60
+    # First retry delay after a transient cache creation failure (see
+    # ContextCacheManager)
+    CONTEXT_CACHE_RETRY_SECONDS = 30
+    
+    # WHY: Schema-constrained JSON output validates straight into
+    # IngestionResult instead of being regex-parsed out of free-form text
+    GENERATION_CONFIG = {
+        "response_mime_type": "application/json",
+        "response_schema": IngestionResult,
+    }
+    
+    # WHY: Follow-up turns allowed when a response fails schema validation
+    MAX_FORMAT_RETRIES = 2
+    
+    # Results are cached on disk by content hash when CL_INGESTION_CACHE_DIR
+    # is set (see services/ingestion_cache.py). Bump RESULT_CACHE_VERSION
+    # whenever per-call prompts or section parsing change.
+    RESULT_CACHE_VERSION = 1
+    
+    # Rendered static instructions, keyed by kind (see _build_instruction)
+    _instructions: Dict[str, str] = {}
+    
+    # Context-cached models by cache name. Class-level so every agent
+    # instance shares them (see _get_cached_model).
+    _context_caches = ContextCacheManager(
+        CONTEXT_CACHE_TTL_SECONDS, CONTEXT_CACHE_REFRESH_MARGIN_SECONDS, CONTEXT_CACHE_RETRY_SECONDS
+    )
+    
+    # Chunks of large documents are extracted concurrently (see
+    # _process_large_text); class-level so concurrent ingestions share the
+    # bound and stay within Gemini's rate limits
+    MAX_CONCURRENT_CHUNKS = 5
+    _chunk_semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+    
     def __init__(self):
         super().__init__("IngestionAgent")
-        self.model = gemini_flash()
+        self.model = _get_model()
+        
+        # Casefolded list-section names -> LIST_SECTIONS keys, so
+        # _extract_all_sections fills every section in one scan
+        self._list_section_keys = {
+            self.SECTION_HEADERS[key].casefold(): key for key in self.LIST_SECTIONS
+        }
 
     async def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -115,56 +388,187 @@ class IngestionAgent(Agent):
         input_type = input_data['type']
         content = input_data['content']
         
-        if not content or (isinstance(content, str) and len(content.strip()) == 0):
+        if not content or (isinstance(content, str) and _is_blank(content)):
             raise ValueError("content cannot be empty")
         
+        # WHY: Decode a base64 PDF once up front; the bytes are a quarter
+        # smaller than the base64 text and are what the cache key hashes
+        if input_type == 'pdf' and isinstance(content, str):
+            try:
+                content = base64.b64decode(content)
+            except ValueError as e:
+                raise ValueError(f"Failed to decode PDF: {str(e)}")
+        
+        # ========================================================================
+        # RESULT CACHE (Opt-in)
+        # ========================================================================
+        # WHY: Re-uploading the same document should not re-run a 10-60s LLM
+        # pipeline; cached results are re-validated against the schema
+        
+        cache_key = None
+        if ingestion_cache.cache_dir() is not None and isinstance(content, (str, bytes)):
+            cache_key = ingestion_cache.make_key(
+                str(input_type),
+                content,
+                f"{self.CONTEXT_CACHE_VERSION}.{self.RESULT_CACHE_VERSION}",
+            )
+            cached = await asyncio.to_thread(ingestion_cache.get, cache_key)
+            if cached is not None:
+                try:
+                    return IngestionResult(**cached).dict()
+                except ValueError:
+                    pass  # Stale or corrupt entry; recompute and overwrite
+        
         # ========================================================================
         # MODALITY ROUTING
         # ========================================================================
         # WHY: Different input types require specialized processing strategies
         
+        # WHY: Responses are parsed into the typed schema for downstream
+        # agents (see _generate_result); chunked documents merge per chunk
+        
         if input_type == 'image':
-            result_text = await self._process_image(content)
-        elif input_type == 'text':
+            ingestion_result = await self._process_image(content)
+        elif input_type in ('text', 'pdf'):
+            if input_type == 'pdf':
+                # Rebinding content releases the PDF bytes before the LLM calls
+                content = await asyncio.to_thread(self._extract_pdf_text, content)
+            
             # WHY: Size-based routing for optimal performance
             if len(content) > self.MAX_CHUNK_SIZE:
-                result_text = await self._process_large_text(content)
+                ingestion_result = await self._process_large_text(content)
             else:
-                result_text = await self._process_text(content)
+                ingestion_result = await self._process_text(content)
         else:
             raise ValueError(
                 f"Unsupported input type: {input_type}. "
-                f"Must be 'text' or 'image'"
+                f"Must be 'text', 'image' or 'pdf'"
             )
         
-        # ========================================================================
-        # STRUCTURED EXTRACTION
-        # ========================================================================
-        # WHY: Parse LLM output into typed schema for downstream agents
-        
-        ingestion_result = IngestionResult(
-            core_concepts=self._extract_section(result_text, self.SECTION_HEADERS["concepts"]),
-            definitions=self._extract_section(result_text, self.SECTION_HEADERS["definitions"]),
-            examples=self._extract_section(result_text, self.SECTION_HEADERS["examples"]),
-            diagram_descriptions=self._extract_section(result_text, self.SECTION_HEADERS["diagrams"]),
-            clean_markdown=result_text
-        )
-        
         # ========================================================================
         # OUTPUT VALIDATION
         # ========================================================================
-        # WHY: Catch processing failures before they propagate downstream
+        # WHY: Catch processing failures before they propagate downstream.
+        # Repeated items (e.g. a concept named in overlapping chunks) are
+        # dropped first so downstream agents don't process them twice.
         
+        ingestion_result = self._dedupe_result(ingestion_result)
         self._validate_output(ingestion_result)
         
-        return ingestion_result.dict()
+        result = ingestion_result.dict()
+        if cache_key is not None:
+            await asyncio.to_thread(ingestion_cache.put, cache_key, result)
+        return result
+
+    
+    # ============================================================================
+    # GEMINI CALLS (Context-Cached Instructions)
+    # ============================================================================
+    
+    async def _generate_result(self, kind: str, parts: List[Any]) -> IngestionResult:
+        """
+        Generate and validate one IngestionResult, re-prompting on bad output.
+        
+        WHY: Schema-constrained output still occasionally fails validation
+        (e.g. malformed or truncated JSON). Sending the validation error back
+        as a follow-up turn lets Gemini correct it; the common case costs
+        nothing extra. Output cut off at the token limit is not retried:
+        replaying it would double the input only to hit the same limit.
+        The last response goes through the fallback of _parse_result.
+        """
+        retry_turns: List[Dict[str, Any]] = []
+        for attempt in range(self.MAX_FORMAT_RETRIES + 1):
+            result_text = await self._generate_content(kind, parts, retry_turns)
+            try:
+                return IngestionResult.model_validate_json(result_text)
+            except ValidationError as e:
+                if attempt == self.MAX_FORMAT_RETRIES or _is_truncated_json(e):
+                    break
+                logger.warning(
+                    "Invalid %s extraction output (attempt %d), retrying: %s",
+                    kind, attempt + 1, e,
+                )
+                retry_turns += [
+                    {"role": "model", "parts": [result_text]},
+                    {"role": "user", "parts": [
+                        f"Your output failed validation:\n{e}\n\n"
+                        "Return the complete corrected JSON object only."
+                    ]},
+                ]
+        
+        return self._parse_result(result_text)
+    
+    async def _generate_content(
+        self, kind: str, parts: List[Any], retry_turns: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """
+        Send per-call parts behind the static instruction for `kind`.
+        
+        WHY: The extraction mandate, prohibitions and output format are
+        several KB that never change between calls. Served from an explicit
+        context cache they are billed at the cached-token rate; without one
+        they are prepended to the first text part as before, so the prompt
+        Gemini sees is unchanged.
+        
+        `retry_turns` continues the conversation after the first user turn
+        (see _generate_result).
+        """
+        model = await self._get_cached_model(kind)
+        if model is None:
+            parts = [self._build_instruction(kind) + "\n\n" + parts[0], *parts[1:]]
+        contents = [{"role": "user", "parts": parts}, *retry_turns] if retry_turns else parts
+        
+        if model is None:
+            return (await self.model.generate_content_async(
+                contents, generation_config=self.GENERATION_CONFIG
+            )).text
+        
+        try:
+            return (await model.generate_content_async(
+                contents, generation_config=self.GENERATION_CONFIG
+            )).text
+        except Exception:
+            # Cache may have been evicted server-side; rebuild on next call
+            self._context_caches.invalidate(self._context_cache_name(kind))
+            raise
+    
+    async def _get_cached_model(self, kind: str):
+        """
+        Return a model bound to a context cache of the instruction for `kind`,
+        or None while caching is unavailable (see ContextCacheManager).
+        """
+        return await self._context_caches.get(
+            self._context_cache_name(kind), functools.partial(self._build_instruction, kind)
+        )
+    
+    def _context_cache_name(self, kind: str) -> str:
+        """Display name of the context cache for `kind` (shared across processes)."""
+        return f"ingestion-v{self.CONTEXT_CACHE_VERSION}-{kind}"
+    
+    def _build_instruction(self, kind: str) -> str:
+        """
+        Return the static system instruction for `kind`, rendered once.
+        
+        WHY: The instructions only depend on SECTION_HEADERS, so each is
+        formatted once per process instead of on every ingestion call.
+        """
+        instruction = IngestionAgent._instructions.get(kind)
+        if instruction is None:
+            instruction_builders = {
+                "text": self._build_text_instruction,
+                "image": self._build_image_instruction,
+                "chunk": self._build_chunk_instruction,
+            }
+            instruction = instruction_builders[kind]()
+            IngestionAgent._instructions[kind] = instruction
+        return instruction
 
     
     # ============================================================================
     # IMAGE PROCESSING (Multimodal Perception + OCR)
     # ============================================================================
     
-    async def _process_image(self, base64_content: str) -> str:
+    async def _process_image(self, base64_content: str) -> IngestionResult:
         """
         Process image input using multimodal vision + OCR capabilities.
         
@@ -177,22 +581,37 @@ class IngestionAgent(Agent):
         - Diagrams and charts (flows, graphs, illustrations)
         - Mixed content (text + visuals combined)
         """
+        # WHY: Decoding a multi-MB upload takes long enough to stall other
+        # requests on the event loop, so it runs in a worker thread
+        image = await asyncio.to_thread(_decode_image_cached, base64_content, self.IMAGE_DRAFT_SIZE)
+        
+        return await self._generate_result("image", [_IMAGE_PROMPT_TAIL, image])
+    
+    def _extract_pdf_text(self, pdf_bytes: bytes) -> str:
+        """Extract page-marked text from PDF bytes (blocking)."""
         try:
-            image_data = base64.b64decode(base64_content)
-            image = Image.open(BytesIO(image_data))
+            text = extract_pdf_text(pdf_bytes)
         except Exception as e:
-            raise ValueError(f"Failed to decode image: {str(e)}")
+            raise ValueError(f"Failed to read PDF: {str(e)}")
         
+        if _is_blank(text):
+            raise ValueError(
+                "Could not extract text from PDF. The PDF may contain only images."
+            )
+        return text
+    
+    def _build_image_instruction(self) -> str:
+        """Static image extraction instruction (see _build_instruction)."""
         # ========================================================================
         # HIGH-FIDELITY IMAGE EXTRACTION PROMPT
         # ========================================================================
-        # WHY: This prompt encodes strict extraction principles:
+        # WHY: This instruction encodes strict extraction principles:
         # - Complete OCR (no skipped text)
         # - Spatial awareness (layout preservation)
         # - Visual semantics (diagram understanding)
         # - Zero hallucination (extract only what's visible)
         
-        prompt = f"""You are a HIGH-FIDELITY DOCUMENT PERCEPTION SYSTEM.
+        return f"""You are a HIGH-FIDELITY DOCUMENT PERCEPTION SYSTEM.
 
 Your task is MULTIMODAL EXTRACTION ONLY - not teaching, not interpreting.
 
@@ -245,28 +664,28 @@ ABSOLUTE PROHIBITIONS (DO NOT VIOLATE)
 REMEMBER: You are a SCANNER, not a TEACHER.
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-OUTPUT FORMAT (MANDATORY - Use exact headers)
+OUTPUT FORMAT (MANDATORY - JSON object with exactly these fields)
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-## 1. {self.SECTION_HEADERS["concepts"]}
+"core_concepts" - {self.SECTION_HEADERS["concepts"]} (list of strings)
 [List all distinct topics, technical terms, concepts, theorems mentioned]
-- [One concept per line]
+- [One concept per item]
 - [Extract verbatim from image - don't invent names]
 - [Include ALL concepts, even if briefly mentioned]
 
-## 2. {self.SECTION_HEADERS["definitions"]}
+"definitions" - {self.SECTION_HEADERS["definitions"]} (list of strings)
 [List all explicit definitions, formulas, equations, technical terms defined]
 - [Format: "Term: Definition" or "Formula: Expression"]
 - [Use mathematical notation exactly as shown]
 - [Include ALL definitions, even partial ones]
 
-## 3. {self.SECTION_HEADERS["examples"]}
+"examples" - {self.SECTION_HEADERS["examples"]} (list of strings)
 [List all examples, worked problems, use cases, code samples]
 - [Include complete problem statements and solutions]
 - [Preserve code/pseudocode formatting]
 - [Extract ALL examples shown]
 
-## 4. {self.SECTION_HEADERS["diagrams"]}
+"diagram_descriptions" - {self.SECTION_HEADERS["diagrams"]} (list of strings)
 [Describe ALL visual elements: diagrams, charts, graphs, illustrations, tables]
 - [For each visual element, describe:]
   - Type (flowchart, tree, graph, etc.)
@@ -275,8 +694,8 @@ OUTPUT FORMAT (MANDATORY - Use exact headers)
   - Spatial layout (what's above/below/beside what)
   - Any axes, legends, or keys
 
-## 5. {self.SECTION_HEADERS["markdown"]}
-[IMPORTANT: Do NOT just repeat sections 1-4 as bullet lists]
+"clean_markdown" - {self.SECTION_HEADERS["markdown"]} (one markdown string)
+[IMPORTANT: Do NOT just repeat the four lists above as bullet lists]
 [Instead, create a COMPREHENSIVE, WELL-STRUCTURED markdown document]
 [This is the detailed study material - organize it narratively]
 
@@ -291,22 +710,15 @@ STRUCTURE REQUIREMENTS:
 • Format equations with LaTeX or Unicode
 • Preserve tables using markdown table syntax
 
-CRITICAL: This section should be COMPLETE and READABLE - someone should be able
-to learn from this markdown document alone, without seeing the original image.
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-Begin extraction now. Output ONLY the structured format above."""
-
-        response = self.model.generate_content([prompt, image])
-        return response.text
+CRITICAL: This field should be COMPLETE and READABLE - someone should be able
+to learn from this markdown document alone, without seeing the original image."""
 
     
     # ============================================================================
     # TEXT PROCESSING (Structured Content Extraction)
     # ============================================================================
     
-    async def _process_text(self, content: str) -> str:
+    async def _process_text(self, content: str) -> IngestionResult:
         """
         Process text input with high-fidelity extraction.
         
@@ -320,11 +732,16 @@ Begin extraction now. Output ONLY the structured format above."""
         - Pasted content from various sources
         """
         
+        prompt = _TEXT_PROMPT_TMPL.format_map({"content": content})
+        return await self._generate_result("text", [prompt])
+    
+    def _build_text_instruction(self) -> str:
+        """Static text extraction instruction (see _build_instruction)."""
         # ========================================================================
         # HIGH-FIDELITY TEXT EXTRACTION PROMPT
         # ========================================================================
         
-        prompt = f"""You are a HIGH-FIDELITY KNOWLEDGE STRUCTURING SYSTEM.
+        return f"""You are a HIGH-FIDELITY KNOWLEDGE STRUCTURING SYSTEM.
 
 Your task is FAITHFUL EXTRACTION AND ORGANIZATION - not teaching, not interpreting.
 
@@ -384,42 +801,42 @@ When you're uncertain about structure:
 • Use neutral organizational headers
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-OUTPUT FORMAT (MANDATORY - Use exact headers)
+OUTPUT FORMAT (MANDATORY - JSON object with exactly these fields)
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-## 1. {self.SECTION_HEADERS["concepts"]}
+"core_concepts" - {self.SECTION_HEADERS["concepts"]} (list of strings)
 [Identify ALL distinct concepts, topics, and technical terms]
-- [One concept per line - be exhaustive, not selective]
+- [One concept per item - be exhaustive, not selective]
 - [Extract names verbatim from source]
 - [Include even briefly mentioned concepts]
 - [Cover: main topics, subtopics, theorems, algorithms, data structures, etc.]
 
-## 2. {self.SECTION_HEADERS["definitions"]}
+"definitions" - {self.SECTION_HEADERS["definitions"]} (list of strings)
 [Extract ALL explicit definitions, formulas, equations, technical terms]
 - [Format: "Term: Definition" OR use source's format]
 - [Preserve mathematical notation EXACTLY (LaTeX, Unicode, or as written)]
 - [Include ALL definitions, even informal ones]
 - [Preserve formulas with all variables defined]
 
-## 3. {self.SECTION_HEADERS["examples"]}
+"examples" - {self.SECTION_HEADERS["examples"]} (list of strings)
 [Extract ALL examples, use cases, code samples, worked problems]
 - [Include complete problem statements AND solutions]
 - [Preserve code/pseudocode blocks with formatting]
 - [Include use cases, scenarios, applications]
 - [Extract ALL examples shown - none are too minor]
 
-## 4. {self.SECTION_HEADERS["diagrams"]}
+"diagram_descriptions" - {self.SECTION_HEADERS["diagrams"]} (list of strings)
 [Extract descriptions of ANY mentioned diagrams, figures, tables, visual elements]
 - [If text references "see figure", "as shown in diagram", describe what it says about it]
 - [Include ASCII art or text-based diagrams]
 - [Describe tables in terms of structure and content]
 - [Note: "No diagrams present" if none mentioned]
 
-## 5. {self.SECTION_HEADERS["markdown"]}
-[CRITICAL: Do NOT simply copy sections 1-4 as lists]
+"clean_markdown" - {self.SECTION_HEADERS["markdown"]} (one markdown string)
+[CRITICAL: Do NOT simply copy the four lists above]
 [Instead, create a COMPREHENSIVE, WELL-ORGANIZED markdown document]
 
-REQUIREMENTS FOR THIS SECTION:
+REQUIREMENTS FOR THIS FIELD:
 • Create a complete study document with proper narrative structure
 • Use hierarchical headers (##, ###, ####) to organize content
 • Group related concepts together logically
@@ -441,27 +858,14 @@ ORGANIZATION STRATEGY:
 COMPLETENESS CHECK:
 Someone should be able to learn this material from your markdown alone,
 without seeing the original source. Include ALL explanations, details,
-and context present in the source.
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-INPUT CONTENT
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-{content}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-Begin extraction now. Output ONLY the structured format above."""
-
-        response = self.model.generate_content(prompt)
-        return response.text
+and context present in the source."""
 
     
     # ============================================================================
     # LARGE DOCUMENT PROCESSING (Intelligent Chunking)
     # ============================================================================
     
-    async def _process_large_text(self, content: str) -> str:
+    async def _process_large_text(self, content: str) -> IngestionResult:
         """
         Process large documents (20-30 pages) via intelligent chunking.
         
@@ -471,31 +875,50 @@ Begin extraction now. Output ONLY the structured format above."""
         STRATEGY:
         1. Split on semantic boundaries (sections, pages, paragraphs)
         2. Process each chunk independently
-        3. Merge results preserving structure
+        3. Merge results field by field, preserving structure
         4. Avoid breaking mid-concept or mid-example
         """
         
-        print(f"📄 Large document detected ({len(content):,} characters). Chunking...")
+        logger.info("Large document detected (%d characters). Chunking...", len(content))
         
         # Split into semantic chunks
         chunks = self._intelligent_chunk(content)
         
-        print(f"📄 Split into {len(chunks)} chunks for processing")
+        logger.info("Split into %d chunks for processing", len(chunks))
         
-        all_results = []
+        async def process_chunk(i: int, chunk: str) -> IngestionResult:
+            async with self._chunk_semaphore:
+                logger.info("Processing chunk %d/%d", i + 1, len(chunks))
+                return await self._generate_result("chunk", [self._build_chunk_prompt(i, len(chunks), chunk)])
         
-        for i, chunk in enumerate(chunks):
-            print(f"  Processing chunk {i+1}/{len(chunks)}...")
-            
-            # ====================================================================
-            # CHUNK-AWARE EXTRACTION PROMPT
-            # ====================================================================
-            # WHY: Each chunk is processed independently, but must maintain
-            # consistent format and avoid assuming context from other chunks
-            
-            prompt = f"""You are a HIGH-FIDELITY KNOWLEDGE STRUCTURING SYSTEM processing a CHUNK of a larger document.
-
-CONTEXT: This is chunk {i+1} of {len(chunks)} from a multi-part document.
+        # WHY: Each chunk is extracted independently, so the calls can overlap;
+        # gather returns results in chunk order for the merge
+        all_results = await asyncio.gather(
+            *(process_chunk(i, chunk) for i, chunk in enumerate(chunks))
+        )
+        
+        logger.info("All chunks processed. Merging results...")
+        
+        # Merge chunks while preserving structure
+        merged = self._merge_results(all_results)
+        
+        logger.info("Large document processing complete")
+        
+        return merged
+    
+    def _build_chunk_prompt(self, index: int, total: int, chunk: str) -> str:
+        """Build the per-chunk prompt (pure; the chunk position is its only context)."""
+        return _CHUNK_PROMPT_TMPL.format_map({"part": index + 1, "total": total, "chunk": chunk})
+    
+    def _build_chunk_instruction(self) -> str:
+        """Static per-chunk extraction instruction (see _build_instruction)."""
+        # ====================================================================
+        # CHUNK-AWARE EXTRACTION PROMPT
+        # ====================================================================
+        # WHY: Each chunk is processed independently, but must maintain
+        # consistent format and avoid assuming context from other chunks
+        
+        return f"""You are a HIGH-FIDELITY KNOWLEDGE STRUCTURING SYSTEM processing a CHUNK of a larger document.
 
 CRITICAL INSTRUCTIONS:
 • Process THIS CHUNK independently (no assumptions about other chunks)
@@ -514,51 +937,29 @@ EXTRACTION PRINCIPLES (SAME AS ALWAYS)
 • No aggressive summarization
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-OUTPUT FORMAT (MANDATORY - Use exact headers)
+OUTPUT FORMAT (MANDATORY - JSON object with exactly these fields)
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-## 1. {self.SECTION_HEADERS["concepts"]}
+"core_concepts" - {self.SECTION_HEADERS["concepts"]} (list of strings)
 [All concepts in THIS CHUNK]
-- [Extract verbatim - one per line]
+- [Extract verbatim - one per item]
 
-## 2. {self.SECTION_HEADERS["definitions"]}
+"definitions" - {self.SECTION_HEADERS["definitions"]} (list of strings)
 [All definitions in THIS CHUNK]
 - [Preserve exact notation and wording]
 
-## 3. {self.SECTION_HEADERS["examples"]}
+"examples" - {self.SECTION_HEADERS["examples"]} (list of strings)
 [All examples in THIS CHUNK]
 - [Include complete examples even if they span to next chunk]
 
-## 4. {self.SECTION_HEADERS["diagrams"]}
+"diagram_descriptions" - {self.SECTION_HEADERS["diagrams"]} (list of strings)
 [Any diagrams mentioned in THIS CHUNK]
 - [Describe or note "No diagrams in this chunk"]
 
-## 5. {self.SECTION_HEADERS["markdown"]}
+"clean_markdown" - {self.SECTION_HEADERS["markdown"]} (one markdown string)
 [Comprehensive markdown document from THIS CHUNK]
 [Use proper headers, paragraphs, and formatting]
-[Include ALL content from this chunk in readable form]
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-CHUNK CONTENT
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-{chunk}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-Begin extraction now. Output ONLY the structured format above."""
-            
-            response = self.model.generate_content(prompt)
-            all_results.append(response.text)
-        
-        print(f"✅ All chunks processed. Merging results...")
-        
-        # Merge chunks while preserving structure
-        merged = self._merge_chunks(all_results)
-        
-        print(f"✅ Large document processing complete")
-        
-        return merged
+[Include ALL content from this chunk in readable form]"""
     
     def _intelligent_chunk(self, content: str) -> List[str]:
         """
@@ -574,65 +975,105 @@ Begin extraction now. Output ONLY the structured format above."""
         
         STRATEGY (Priority order):
         1. Split on page markers (from PDF extraction)
+        (Between 1 and 2, content under twice the limit is split once at the
+        paragraph break nearest the middle when both halves fit.)
         2. Split on section headers (##, ###, etc.)
         3. Split on paragraph boundaries
         4. Last resort: hard character split with overlap
         """
         
-        if not content or len(content) <= self.MAX_CHUNK_SIZE:
+        # Locals: the accumulation loops below run once per page/section/paragraph
+        max_size = self.MAX_CHUNK_SIZE
+        if not content or len(content) <= max_size:
             return [content]
         
         chunks = []
+        add_chunk = chunks.append
         
         # ====================================================================
         # STRATEGY 1: Page-based chunking (best for PDFs)
         # ====================================================================
         # WHY: Page boundaries are natural semantic breaks
         
-        if "--- Page" in content or "Page " in content[:500]:
-            pages = re.split(r'\n?---\s*Page\s+\d+\s*---\n?', content, flags=re.IGNORECASE)
-            
-            current_chunk = ""
-            for page in pages:
-                if not page.strip():
+        # Only split when a real "--- Page N ---" marker exists: a stray
+        # "Page " in the text used to send marker-less documents through a
+        # full split that returned the whole document as one oversized chunk.
+        # The search stops at the first marker, which PDF text has up top.
+        if _PAGE_MARKER_RE.search(content):
+            # WHY: Chunks grow to hundreds of KB; collecting parts and joining
+            # once per chunk copies each page once instead of on every +=
+            current_parts: List[str] = []
+            current_len = 0
+            for page in _iter_split(_PAGE_SPLIT_RE, content):
+                if _is_blank(page):
                     continue
                 
                 # Accumulate pages until size limit
-                if len(current_chunk) + len(page) < self.MAX_CHUNK_SIZE:
-                    current_chunk += "\n\n" + page
+                page_len = len(page)
+                if current_len + page_len < max_size:
+                    current_parts.append("\n\n")
+                    current_parts.append(page)
+                    current_len += page_len + 2
                 else:
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                    current_chunk = page
+                    if current_parts:
+                        add_chunk("".join(current_parts).strip())
+                    current_parts = [page]
+                    current_len = page_len
             
-            if current_chunk.strip():
-                chunks.append(current_chunk.strip())
+            current_chunk = "".join(current_parts).strip()
+            if current_chunk:
+                add_chunk(current_chunk)
             
             if chunks:
                 return chunks
         
+        # ====================================================================
+        # FAST PATH: Slightly oversized content
+        # ====================================================================
+        # WHY: Documents just over the limit are the common case. When a
+        # paragraph break lets both halves fit, split there (nearest the
+        # middle, for balanced calls) instead of walking every section and
+        # paragraph below.
+        
+        content_len = len(content)
+        if content_len < 2 * max_size:
+            middle = content_len // 2
+            before = content.rfind("\n\n", content_len - max_size, middle + 1)
+            after = content.find("\n\n", middle, max_size)
+            if before < 0 or (after >= 0 and after - middle < middle - before):
+                before = after
+            if before >= 0:
+                head = content[:before].strip()
+                tail = content[before + 2:].strip()
+                if head and tail:
+                    return [head, tail]
+        
         # ====================================================================
         # STRATEGY 2: Section-based chunking
         # ====================================================================
         # WHY: Markdown headers indicate logical section boundaries
         
-        sections = re.split(r'\n(?=#{1,3} )', content)
-        
-        if len(sections) > 1:
-            current_chunk = ""
-            for section in sections:
-                if not section.strip():
+        if _SECTION_SPLIT_RE.search(content):
+            current_parts = []
+            current_len = 0
+            for section in _iter_split(_SECTION_SPLIT_RE, content):
+                if _is_blank(section):
                     continue
                 
-                if len(current_chunk) + len(section) < self.MAX_CHUNK_SIZE:
-                    current_chunk += "\n\n" + section
+                section_len = len(section)
+                if current_len + section_len < max_size:
+                    current_parts.append("\n\n")
+                    current_parts.append(section)
+                    current_len += section_len + 2
                 else:
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                    current_chunk = section
+                    if current_parts:
+                        add_chunk("".join(current_parts).strip())
+                    current_parts = [section]
+                    current_len = section_len
             
-            if current_chunk.strip():
-                chunks.append(current_chunk.strip())
+            current_chunk = "".join(current_parts).strip()
+            if current_chunk:
+                add_chunk(current_chunk)
             
             if chunks:
                 return chunks
@@ -642,38 +1083,81 @@ Begin extraction now. Output ONLY the structured format above."""
         # ====================================================================
         # WHY: Paragraph boundaries are safer than mid-sentence splits
         
-        paragraphs = content.split('\n\n')
-        
-        current_chunk = ""
-        for para in paragraphs:
-            if len(current_chunk) + len(para) < self.MAX_CHUNK_SIZE:
-                current_chunk += para + "\n\n"
+        current_parts = []
+        current_len = 0
+        for para in _iter_paragraphs(content):
+            para_len = len(para)
+            if current_len + para_len < max_size:
+                current_parts.append(para)
+                current_parts.append("\n\n")
+                current_len += para_len + 2
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = para + "\n\n"
+                if current_parts:
+                    add_chunk("".join(current_parts).strip())
+                current_parts = [para, "\n\n"]
+                current_len = para_len + 2
         
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        current_chunk = "".join(current_parts).strip()
+        if current_chunk:
+            add_chunk(current_chunk)
         
         # ====================================================================
         # STRATEGY 4: Hard split with overlap (last resort)
         # ====================================================================
         # WHY: Some documents have no natural boundaries. Use overlap to
-        # prevent losing context at chunk boundaries.
+        # prevent losing context at chunk boundaries: chunk i covers
+        # content[i*stride : i*stride + max_size].
         
-        if not chunks or any(len(c) > self.MAX_CHUNK_SIZE for c in chunks):
-            chunks = []
-            overlap = 1000  # characters overlap between chunks
+        if not chunks or any(len(c) > max_size for c in chunks):
+            chunks.clear()
+            overlap = int(max_size * self.OVERLAP_RATIO)
+            stride = max(max_size - overlap, 1)
             pos = 0
             
-            while pos < len(content):
-                end = min(pos + self.MAX_CHUNK_SIZE, len(content))
-                chunks.append(content[pos:end])
-                pos = end - overlap if end < len(content) else end
+            while True:
+                end = pos + max_size
+                add_chunk(content[pos:end])
+                if end >= content_len:
+                    break
+                pos += stride
         
         return chunks if chunks else [content]
     
+    def _merge_results(self, results: List[IngestionResult]) -> IngestionResult:
+        """
+        Merge per-chunk results into one result for the whole document.
+        
+        WHY: Every chunk yields its own lists; concatenating them keeps items
+        from every chunk (run() drops repeats), and the markdown notes are
+        joined in chunk order.
+        """
+        def merged_items(field: str) -> List[str]:
+            return [item for result in results for item in getattr(result, field)]
+        
+        return IngestionResult(
+            core_concepts=merged_items("core_concepts"),
+            definitions=merged_items("definitions"),
+            examples=merged_items("examples"),
+            diagram_descriptions=merged_items("diagram_descriptions"),
+            clean_markdown=self._merge_chunks([r.clean_markdown for r in results]),
+        )
+    
+    def _dedupe_result(self, result: IngestionResult) -> IngestionResult:
+        """
+        Drop repeated list items, matching concepts case-insensitively, and
+        intern the short ones (see _strip_item).
+        
+        WHY: Overlapping chunks and the model itself repeat items; every
+        repeat is extra work for the tutor and game master downstream.
+        """
+        return IngestionResult(
+            core_concepts=_dedupe_items(result.core_concepts, fold_case=True),
+            definitions=_dedupe_items(result.definitions),
+            examples=_dedupe_items(result.examples),
+            diagram_descriptions=_dedupe_items(result.diagram_descriptions),
+            clean_markdown=result.clean_markdown,
+        )
+    
     def _merge_chunks(self, chunk_results: List[str]) -> str:
         """
         Merge processed chunks into single coherent document.
@@ -693,145 +1177,179 @@ Begin extraction now. Output ONLY the structured format above."""
         if len(chunk_results) == 1:
             return chunk_results[0]
         
-        merged = f"# Complete Document\n\n"
-        merged += f"*Note: This document was processed in {len(chunk_results)} chunks for scale*\n\n"
+        # WHY: Chunk results run to hundreds of KB each; joining once copies
+        # every result a single time instead of regrowing the string per +=
+        total = len(chunk_results)
+        parts = [
+            "# Complete Document\n\n",
+            f"*Note: This document was processed in {total} chunks for scale*\n\n",
+        ]
         
-        for i, chunk_result in enumerate(chunk_results):
-            merged += f"\n\n<!-- ═══════════════════════════════════════════════════════ -->\n"
-            merged += f"<!-- CHUNK {i+1} of {len(chunk_results)} -->\n"
-            merged += f"<!-- ═══════════════════════════════════════════════════════ -->\n\n"
-            merged += chunk_result
+        for i, chunk_result in enumerate(chunk_results, 1):
+            parts.append(
+                f"\n\n<!-- ═══════════════════════════════════════════════════════ -->\n"
+                f"<!-- CHUNK {i} of {total} -->\n"
+                f"<!-- ═══════════════════════════════════════════════════════ -->\n\n"
+            )
+            parts.append(chunk_result)
         
-        return merged
+        return "".join(parts)
 
     
     # ============================================================================
     # STRUCTURED SECTION EXTRACTION
     # ============================================================================
     
-    def _extract_section(self, text: str, section_name: str) -> List[str]:
+    def _parse_result(self, result_text: str) -> IngestionResult:
         """
-        Robustly extract sections from LLM output with multiple fallback strategies.
+        Parse one Gemini response into the typed schema.
         
-        WHY: LLMs may format output inconsistently despite instructions.
-        Multiple extraction patterns ensure we capture content regardless of
-        minor formatting variations.
+        WHY: Responses are requested as IngestionResult JSON (see
+        GENERATION_CONFIG) and validate directly. Invalid JSON (e.g. cut off
+        at the token limit) is salvaged; a response that is not JSON at all
+        (e.g. plain markdown) falls back to section parsing, with the raw
+        text kept as the markdown notes.
+        """
+        try:
+            return IngestionResult.model_validate_json(result_text)
+        except ValueError:
+            pass
+        
+        if result_text.lstrip().startswith('{'):
+            return self._salvage_result(result_text)
+        
+        sections = self._extract_all_sections(result_text)
+        return IngestionResult(
+            core_concepts=sections["concepts"],
+            definitions=sections["definitions"],
+            examples=sections["examples"],
+            diagram_descriptions=sections["diagrams"],
+            clean_markdown=result_text
+        )
+    
+    def _salvage_result(self, result_text: str) -> IngestionResult:
+        """
+        Recover the fields of an invalid JSON response, up to where it breaks.
         
-        STRATEGY:
-        1. Try numbered headers (## 1. Section Name)
-        2. Try plain headers (## Section Name)
-        3. Try with/without colons
-        4. Fallback to line-by-line extraction
-        5. Return empty list rather than fail
+        WHY: The JSON itself must never become the learner's notes. A response
+        cut off at the token limit still parses up to the cut, keeping every
+        complete list item and the markdown written so far; without any
+        markdown there is nothing worth returning.
         """
+        try:
+            data = from_json(result_text, allow_partial='trailing-strings')
+        except ValueError:
+            data = None
         
-        # ====================================================================
-        # PATTERN MATCHING (Multiple formats)
-        # ====================================================================
-        # WHY: Different LLM runs may format slightly differently
-        
-        patterns = [
-            # Numbered header with period: ## 1. Section Name
-            rf'##\s*\d+\.\s*{re.escape(section_name)}[:\s]*\n(.*?)(?=\n##\s*\d+\.|\Z)',
-            # Plain header: ## Section Name
-            rf'##\s*{re.escape(section_name)}[:\s]*\n(.*?)(?=\n##|\Z)',
-            # With any heading level (##, ###)
-            rf'#{2,3}\s*\d*\.?\s*{re.escape(section_name)}[:\s]*\n(.*?)(?=\n#{2,3}|\Z)',
-            # Relaxed: any line containing section name followed by content
-            rf'{re.escape(section_name)}[:\s]*\n(.*?)(?=\n[A-Z][a-z]+ [A-Z]|\Z)'
-        ]
+        if not isinstance(data, dict) or not isinstance(data.get("clean_markdown"), str):
+            raise ValueError(
+                "Ingestion failed: Gemini returned invalid JSON with no recoverable notes."
+            )
         
-        section_content = None
-        for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-            if match:
-                section_content = match.group(1)
-                break
+        logger.warning("Salvaged partial extraction output (%d chars)", len(result_text))
         
-        if not section_content:
-            # Fallback extraction
-            return self._fallback_extract(text, section_name)
+        def items(field: str) -> List[str]:
+            value = data.get(field)
+            return [item for item in value if isinstance(item, str)] if isinstance(value, list) else []
         
-        # ====================================================================
-        # ITEM EXTRACTION (Bullet points, dashes, numbers)
-        # ====================================================================
-        # WHY: Content may be formatted as lists in various styles
+        return IngestionResult(
+            core_concepts=items("core_concepts"),
+            definitions=items("definitions"),
+            examples=items("examples"),
+            diagram_descriptions=items("diagram_descriptions"),
+            clean_markdown=data["clean_markdown"],
+        )
+    
+    def _extract_all_sections(self, text: str) -> Dict[str, List[str]]:
+        """
+        Extract every list section (keyed as in LIST_SECTIONS) from LLM output.
         
-        lines = section_content.strip().split('\n')
-        items = []
+        WHY: Results for large documents run to MBs; one line scan fills all
+        four sections instead of rescanning the text once per section.
+        """
+        return self._scan_sections(text, self._list_section_keys)
+    
+    def _scan_sections(self, text: str, wanted: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Robustly extract sections' items from LLM output in a single pass.
         
-        for line in lines:
+        WHY: LLMs may format output inconsistently despite instructions.
+        The output is line-structured markdown, so one scan that classifies
+        each line covers the header variants without backtracking regexes
+        re-reading the text once per variant and section.
+        
+        `wanted` maps casefolded section names to result keys.
+        
+        STRATEGY:
+        1. A section starts at the first header naming it: "## 1. Name",
+           "## Name", "### Name" or a plain "Name:" label (any case)
+        2. Collect cleaned list items line by line
+        3. Stop at the next "##" header or known section label
+        4. Missing sections come back as empty lists rather than failing
+        """
+        sections: Dict[str, List[str]] = {key: [] for key in wanted.values()}
+        started = set()
+        current = None  # name of the section being collected
+        
+        for line in text.splitlines():
             line = line.strip()
             
-            # Skip empty lines and meta-instructions
-            if not line or line in ['', '(bullet list)', '(if present)', '(one per line)']:
-                continue
+            if line.startswith('##'):
+                name = _HEADER_RE.match(line).group(1).casefold()
+            elif line.endswith(':'):
+                name = _strip_number_marker(line[:-1]).strip().casefold()
+                if name not in wanted and name not in self._SECTION_NAMES:
+                    name = None  # An ordinary "Label:" line is content
+            else:
+                name = None
             
-            # Skip section headers that leaked in
-            if line.startswith('##') or line.startswith('---'):
+            if name is not None:
+                if name == current:
+                    continue
+                current = None
+                if name in wanted and name not in started:
+                    started.add(name)
+                    current = name
                 continue
             
-            # Remove common list markers
-            cleaned = re.sub(r'^[-•*✓]\s*', '', line)
-            cleaned = re.sub(r'^\d+\.\s*', '', cleaned)
-            cleaned = re.sub(r'^\[.*?\]\s*', '', cleaned)  # Remove [tags]
-            cleaned = cleaned.strip()
-            
-            # Quality filter: skip noise and keep meaningful content
-            if cleaned and len(cleaned) > 3 and not cleaned.startswith('['):
-                items.append(cleaned)
+            if current is not None:
+                cleaned = self._clean_item(line)
+                if cleaned:
+                    sections[wanted[current]].append(cleaned)
         
-        return items
+        return sections
     
-    def _fallback_extract(self, text: str, section_name: str) -> List[str]:
+    def _clean_item(self, line: str) -> str:
         """
-        Fallback extraction when regex patterns fail.
+        Clean one stripped section line into a list item ("" to skip it).
         
-        WHY: Last resort to prevent data loss when LLM formats unexpectedly.
-        Uses simple line-by-line scanning.
+        WHY: Content may be formatted as lists in various styles
+        """
         
-        STRATEGY:
-        - Scan for section name
-        - Collect lines until next section
-        - Clean and filter items
-        """
-        lines = text.splitlines()
-        collecting = False
-        section = []
-        
-        for line in lines:
-            # Detect section start (case-insensitive, flexible)
-            if section_name.lower() in line.lower():
-                if line.strip().startswith('#') or line.strip().endswith(':') or '##' in line:
-                    collecting = True
-                    continue
-            
-            # Collecting mode
-            if collecting:
-                # Stop at next major section
-                if line.strip().startswith('##'):
-                    if section_name.lower() not in line.lower():
-                        break
-                    else:
-                        continue
-                
-                # Extract and clean
-                cleaned = line.strip()
-                
-                # Skip meta-content and empty lines
-                if not cleaned or cleaned in ['', '(bullet list)', '(if present)', '(one per line)']:
-                    continue
-                
-                # Remove list markers
-                cleaned = re.sub(r'^[-•*✓]\s*', '', cleaned)
-                cleaned = re.sub(r'^\d+\.\s*', '', cleaned)
-                cleaned = cleaned.strip()
-                
-                # Keep meaningful content
-                if cleaned and len(cleaned) > 3:
-                    section.append(cleaned)
+        # Skip empty lines and meta-instructions
+        if not line or line in _META_LINES:
+            return ""
+        
+        # Skip section headers that leaked in
+        if line.startswith(('##', '---')):
+            return ""
         
-        return section
+        # Remove common list markers: one bullet, then a number, then a
+        # [tag]. WHY: plain string ops; this runs for every line of output
+        cleaned = line
+        if cleaned[0] in _BULLET_CHARS:
+            cleaned = cleaned[1:].lstrip()
+        cleaned = _strip_number_marker(cleaned)
+        if cleaned.startswith('['):
+            end = cleaned.find(']')
+            if end > 0:
+                cleaned = cleaned[end + 1:].lstrip()
+        cleaned = cleaned.strip()
+        
+        # Quality filter: skip noise and keep meaningful content
+        if cleaned and len(cleaned) > 3 and not cleaned.startswith('['):
+            return cleaned
+        return ""
     
     # ============================================================================
     # OUTPUT VALIDATION
@@ -879,13 +1397,13 @@ Begin extraction now. Output ONLY the structured format above."""
         # (e.g., pure theory without examples, no diagrams in text)
         
         if not result.core_concepts:
-            print("⚠️  Warning: No core concepts extracted - check source content")
+            logger.warning("No core concepts extracted - check source content")
         
         if not result.definitions:
-            print("⚠️  Warning: No definitions extracted - may be legitimate if source has none")
+            logger.warning("No definitions extracted - may be legitimate if source has none")
         
         if not result.examples:
-            print("⚠️  Warning: No examples extracted - may be legitimate if source has none")
+            logger.warning("No examples extracted - may be legitimate if source has none")
         
         # ====================================================================
         # QUALITY INDICATORS (Informational)
@@ -899,4 +1417,4 @@ Begin extraction now. Output ONLY the structured format above."""
             "markdown_chars": len(result.clean_markdown)
         }
         
-        print(f"✅ Ingestion complete: {stats}")
+        logger.info("Ingestion complete: %s", stats)
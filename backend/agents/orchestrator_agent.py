@@ -1,3 +1,5 @@
+from functools import cached_property
+
 from agents.ingestion_agent import IngestionAgent
 from agents.tutor_agent import TutorAgent
 from agents.game_master_agent import GameMasterAgent
@@ -5,10 +7,19 @@ from core.session_state import SessionState
 from core.routing import decide_route
 
 class OrchestratorAgent:
-    def __init__(self):
-        self.ingestion_agent = IngestionAgent()
-        self.tutor_agent = TutorAgent()
-        self.game_master_agent = GameMasterAgent()
+    # Sub-agents are built on first use: a session that only talks to the
+    # tutor never pays for the ingestion or game master setup.
+    @cached_property
+    def ingestion_agent(self) -> IngestionAgent:
+        return IngestionAgent()
+
+    @cached_property
+    def tutor_agent(self) -> TutorAgent:
+        return TutorAgent()
+
+    @cached_property
+    def game_master_agent(self) -> GameMasterAgent:
+        return GameMasterAgent()
 
     async def handle(self, input_data: dict, session: SessionState):
         """
@@ -93,7 +104,10 @@ class OrchestratorAgent:
                 game_input = {
                     "concept": concept,
                     "nuances": input_data.get("nuances", []),
-                    "game_type": game_type
+                    "game_type": game_type,
+                    # Memoized games are fine for a first batch, but refills
+                    # must be new games or the learner replays the same ones.
+                    "use_cache": not existing_games
                 }
                 
                 batch_result = await self.game_master_agent.run(game_input)
@@ -22,6 +22,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import uuid
@@ -29,6 +31,11 @@ from datetime import datetime
 
 from dotenv import load_dotenv
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 from agents.orchestrator_agent import OrchestratorAgent
 from agents.ingestion_agent import IngestionAgent
 from agents.tutor_agent import TutorAgent
@@ -52,10 +59,13 @@ except Exception:
 # APPLICATION SETUP
 # ============================================================================
 
+# orjson serializes the game/tutor payloads (long `why` rationales) several
+# times faster than stdlib json and writes bytes directly.
 app = FastAPI(
     title="Autonomous Tutor API",
     description="AI-powered adaptive learning system with multimodal content ingestion",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
 )
 
 # CORS Configuration for React Frontend
@@ -74,6 +84,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Game batches and tutor replies are text-heavy and compress 3-5x; tiny
+# responses (health checks, acks) are sent as-is.
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # ============================================================================
 # SESSION MANAGEMENT
 # ============================================================================
@@ -355,10 +369,14 @@ async def generate_game(request: GameRequest):
                 detail="No concept available. Ingest content first."
             )
         
+        # Memoized games are fine for a first batch, but repeat requests must
+        # be new games or the learner replays the same ones.
+        already_generated = session.generated_games.get(concept, {}).get(request.game_type)
         game_input = {
             "concept": concept,
             "nuances": request.nuances or [],
-            "game_type": request.game_type
+            "game_type": request.game_type,
+            "use_cache": not already_generated
         }
         
         result = await game_master_agent.run(game_input)
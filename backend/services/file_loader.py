@@ -16,18 +16,26 @@ def load_image_bytes(image_bytes: bytes) -> Dict:
         "content": encoded
     }
 
+def extract_pdf_text(pdf_bytes: bytes) -> str:
+    """
+    Extract page text from a PDF, each page under a "--- Page N ---" marker.
+    """
+    pdf_reader = PdfReader(BytesIO(pdf_bytes))
+    pages = []
+    
+    for page_num, page in enumerate(pdf_reader.pages):
+        text = page.extract_text()
+        if text:
+            pages.append(f"\n--- Page {page_num + 1} ---\n{text}\n")
+    
+    return "".join(pages)
+
 def load_pdf_bytes(pdf_bytes: bytes) -> Dict:
     """
     Extract text from PDF and return as text input.
     """
     try:
-        pdf_reader = PdfReader(BytesIO(pdf_bytes))
-        text_content = ""
-        
-        for page_num, page in enumerate(pdf_reader.pages):
-            text = page.extract_text()
-            if text:
-                text_content += f"\n--- Page {page_num + 1} ---\n{text}\n"
+        text_content = extract_pdf_text(pdf_bytes)
         
         if not text_content.strip():
             return {
@@ -1,7 +1,14 @@
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 import google.generativeai as genai
+from google import genai as google_genai
+from google.api_core import exceptions as google_exceptions
+import asyncio
+import datetime
+import logging
 import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 from dotenv import load_dotenv 
 
 load_dotenv()
@@ -13,6 +20,101 @@ if not api_key:
 
 genai.configure(api_key=api_key)
 
+GEMINI_FLASH_MODEL = "gemini-2.5-flash"
+
+logger = logging.getLogger(__name__)
+
 
 def gemini_flash():
-    return genai.GenerativeModel("gemini-2.5-flash")
\ No newline at end of file
+    return genai.GenerativeModel(GEMINI_FLASH_MODEL)
+
+
+def gemini_flash_cached(system_instruction: str, display_name: str, ttl_seconds: int):
+    """
+    Flash model bound to an explicit context cache holding `system_instruction`.
+    
+    A live cache with the same display name (e.g. from another worker or a
+    previous process) is reused and its TTL renewed instead of creating a
+    duplicate, so callers must version `display_name` when the instruction
+    changes.
+    """
+    ttl = datetime.timedelta(seconds=ttl_seconds)
+    for cached in genai.caching.CachedContent.list(page_size=100):
+        if cached.display_name == display_name and cached.model.endswith(GEMINI_FLASH_MODEL):
+            cached.update(ttl=ttl)
+            return genai.GenerativeModel.from_cached_content(cached)
+    
+    cached = genai.caching.CachedContent.create(
+        model=GEMINI_FLASH_MODEL,
+        display_name=display_name,
+        system_instruction=system_instruction,
+        ttl=ttl,
+    )
+    return genai.GenerativeModel.from_cached_content(cached)
+
+
+class ContextCacheManager:
+    """
+    Context-cached Flash models keyed by cache display name.
+    
+    Caches are created lazily (see gemini_flash_cached) and refreshed
+    shortly before their TTL runs out. get() returns None while caching is
+    unavailable so callers fall back to sending the instruction inline:
+    - InvalidArgument (e.g. the instruction is below the model's minimum
+      cacheable size) will not change, so it is remembered for one TTL.
+    - Anything else (5xx, timeouts) is retried after `retry_seconds`,
+      doubling per consecutive failure up to one TTL, so a transient error
+      does not turn caching off for hours.
+    
+    One manager is shared by every instance of an agent class.
+    """
+    
+    def __init__(self, ttl_seconds: int, refresh_margin_seconds: int, retry_seconds: int = 30):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.retry_seconds = retry_seconds
+        # display name -> (model or None, expires_at)
+        self._models: Dict[str, Tuple[Any, float]] = {}
+        self._failures: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+    
+    async def get(self, display_name: str, build_instruction: Callable[[], str]) -> Optional[Any]:
+        """Model bound to the `display_name` cache, or None while caching is unavailable."""
+        entry = self._models.get(display_name)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        
+        # Concurrent callers miss together; only one of them builds the cache
+        async with self._lock:
+            now = time.monotonic()
+            entry = self._models.get(display_name)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+            
+            try:
+                model = await asyncio.to_thread(
+                    gemini_flash_cached, build_instruction(), display_name, self.ttl_seconds
+                )
+            except Exception as e:
+                logger.warning("Context cache unavailable for %s: %s", display_name, e)
+                if isinstance(e, google_exceptions.InvalidArgument):
+                    retry_in = self.ttl_seconds
+                else:
+                    failures = self._failures.get(display_name, 0) + 1
+                    self._failures[display_name] = failures
+                    retry_in = min(self.retry_seconds * 2 ** (failures - 1), self.ttl_seconds)
+                self._models[display_name] = (None, now + retry_in)
+                return None
+            
+            self._failures.pop(display_name, None)
+            self._models[display_name] = (model, now + self.ttl_seconds - self.refresh_margin_seconds)
+            return model
+    
+    def invalidate(self, display_name: str) -> None:
+        """Forget the model for `display_name` (e.g. its cache was evicted server-side)."""
+        self._models.pop(display_name, None)
+
+
+def gemini_client():
+    """google-genai client for APIs the legacy SDK lacks (e.g. Batch Mode)."""
+    return google_genai.Client(api_key=api_key)
@@ -0,0 +1,92 @@
+"""
+Content-addressed disk cache for IngestionAgent results.
+
+Ingesting the same document twice re-runs the whole Gemini pipeline even
+though the extraction mandate asks for deterministic output. With
+CL_INGESTION_CACHE_DIR set, final results are stored as one JSON file per
+key and a repeat upload becomes a file read. Unset, the cache is disabled.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional, Union
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "CL_INGESTION_CACHE_DIR"
+
+
+def cache_dir() -> Optional[str]:
+    """Directory holding cached results, or None when caching is disabled."""
+    path = os.getenv(CACHE_DIR_ENV)
+    if not path or not path.strip():
+        return None
+    return os.path.expanduser(path.strip())
+
+
+def make_key(input_type: str, content: Union[str, bytes], version: str) -> str:
+    """
+    Hash (version, input_type, content) into a cache key.
+
+    The content is length-prefixed so no (type, content) pair can collide
+    with another by shifting bytes across the boundary.
+    """
+    data = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+    digest = hashlib.sha256()
+    digest.update(f"{version}\0{input_type}\0".encode("utf-8"))
+    digest.update(len(data).to_bytes(8, "big"))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def _path_for(directory: str, key: str) -> str:
+    return os.path.join(directory, f"{key}.json")
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    """Cached result for `key`, or None on a miss or unreadable entry."""
+    directory = cache_dir()
+    if directory is None:
+        return None
+    try:
+        with open(_path_for(directory, key), "r", encoding="utf-8") as f:
+            value = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable ingestion cache entry %s: %s", key, e)
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def put(key: str, value: Dict[str, Any]) -> None:
+    """
+    Store `value` under `key`. Failures are logged, never raised: a cache
+    write must not fail an ingestion that already succeeded.
+    """
+    directory = cache_dir()
+    if directory is None:
+        return
+    tmp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, _path_for(directory, key))
+        tmp_path = None
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("Failed to write ingestion cache entry %s: %s", key, e)
+    finally:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
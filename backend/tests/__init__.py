@@ -0,0 +1,12 @@
+"""
+Backend unit tests (stdlib unittest; run from backend/):
+
+    python -m unittest
+
+services.gemini_client refuses to import without GEMINI_API_KEY. None of
+these tests call Gemini, so a placeholder key is enough.
+"""
+
+import os
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
@@ -0,0 +1,67 @@
+import unittest
+
+from agents.ingestion_agent import IngestionAgent
+
+
+MAX = 100
+
+
+def words(n, word="lorem"):
+    """Boundary-free filler of exactly `n` characters, without edge whitespace."""
+    return ((word + " ") * n)[:n - 1] + "x"
+
+
+class IntelligentChunkTests(unittest.TestCase):
+    def setUp(self):
+        self.agent = IngestionAgent()
+        self.agent.MAX_CHUNK_SIZE = MAX
+
+    def chunk(self, content):
+        chunks = self.agent._intelligent_chunk(content)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), MAX)
+        return chunks
+
+    def test_content_within_limit_is_one_chunk(self):
+        content = words(MAX)
+        self.assertEqual(self.agent._intelligent_chunk(content), [content])
+
+    def test_pages_are_grouped_in_order(self):
+        pages = [words(40, f"p{i}") for i in range(5)]
+        content = "".join(f"--- Page {i + 1} ---\n{page}\n" for i, page in enumerate(pages))
+        chunks = self.chunk(content)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(" ".join(chunks).split(), " ".join(pages).split())
+
+    def test_slightly_oversized_splits_once_near_the_middle(self):
+        paragraphs = [words(30, f"w{i}") for i in range(5)]
+        content = "\n\n".join(paragraphs)
+        self.assertLess(len(content), 2 * MAX)
+        head, tail = self.chunk(content)
+        self.assertEqual(head + "\n\n" + tail, content)
+        # Breaks sit at 30, 62, 94 and 126 of 158 chars: 94 is nearest 79
+        self.assertEqual(head, "\n\n".join(paragraphs[:3]))
+
+    def test_sections_cover_the_whole_document(self):
+        sections = [f"## Part {i}\n{words(60, f's{i}')}" for i in range(6)]
+        content = "\n".join(sections)
+        self.assertGreaterEqual(len(content), 2 * MAX)
+        chunks = self.chunk(content)
+        self.assertEqual(" ".join(chunks).split(), content.split())
+
+    def test_paragraphs_cover_the_whole_document(self):
+        paragraphs = [words(45, f"q{i}") for i in range(8)]
+        content = "\n\n".join(paragraphs)
+        chunks = self.chunk(content)
+        self.assertEqual(" ".join(chunks).split(), content.split())
+
+    def test_hard_split_overlaps_by_ratio(self):
+        content = "".join(chr(ord("a") + i % 26) for i in range(int(3.5 * MAX)))
+        chunks = self.chunk(content)
+        stride = MAX - int(MAX * self.agent.OVERLAP_RATIO)
+        self.assertEqual(chunks, [content[i:i + MAX] for i in range(0, len(content) - MAX + stride, stride)])
+        self.assertTrue(content.endswith(chunks[-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
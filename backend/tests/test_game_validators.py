@@ -0,0 +1,92 @@
+import unittest
+
+from agents.game_master_agent import GameMasterAgent
+
+
+CARDS = [f"card {i}" for i in range(6)]
+
+
+def swipe_sort_game(**overrides):
+    game = {
+        "left_category": "Left",
+        "right_category": "Right",
+        "cards": list(CARDS),
+        "answer_key": {card: "left" if i % 2 else "right" for i, card in enumerate(CARDS)},
+        "why": {card: f"because {card}" for card in CARDS},
+    }
+    game.update(overrides)
+    return game
+
+
+class GameValidatorTests(unittest.TestCase):
+    def setUp(self):
+        self.agent = GameMasterAgent()
+
+    def validate(self, game, game_type="swipe_sort"):
+        self.agent._validate_game_structure(game, game_type)
+        return game
+
+    def assertRejected(self, game, message, game_type="swipe_sort"):
+        with self.assertRaisesRegex(ValueError, message):
+            self.agent._validate_game_structure(game, game_type)
+
+    def test_valid_swipe_sort(self):
+        game = swipe_sort_game()
+        self.assertEqual(self.validate(game), swipe_sort_game())
+
+    def test_swipe_sort_extra_keys_are_dropped(self):
+        game = swipe_sort_game()
+        game["answer_key"]["stray"] = "up"
+        game["why"]["stray"] = ""
+        self.validate(game)
+        self.assertEqual(list(game["answer_key"]), CARDS)
+        self.assertEqual(list(game["why"]), CARDS)
+
+    def test_swipe_sort_rejects_missing_coverage(self):
+        game = swipe_sort_game()
+        del game["answer_key"][CARDS[0]]
+        self.assertRejected(game, "answer_key must map every card")
+        game = swipe_sort_game()
+        del game["why"][CARDS[0]]
+        self.assertRejected(game, "why must include")
+
+    def test_swipe_sort_rejects_bad_side_and_empty_rationale(self):
+        game = swipe_sort_game()
+        game["answer_key"][CARDS[0]] = "up"
+        self.assertRejected(game, "'left' or 'right'")
+        game = swipe_sort_game()
+        game["why"][CARDS[0]] = ""
+        self.assertRejected(game, "non-empty rationale")
+
+    def test_swipe_sort_rejects_unhashable_cards(self):
+        self.assertRejected(swipe_sort_game(cards=[["a"]] * 6), "must be strings")
+
+    def test_swipe_sort_card_range(self):
+        self.assertRejected(swipe_sort_game(cards=CARDS[:5]), "6-8 cards")
+
+    def test_missing_fields_and_wrong_types(self):
+        game = swipe_sort_game()
+        del game["why"]
+        self.assertRejected(game, "missing required fields: why")
+        self.assertRejected(swipe_sort_game(cards="a,b"), "'cards' must be a list")
+
+    def test_impostor(self):
+        game = {"options": ["a", "b", "c", "d"], "impostor": "c", "why": "c is not like the rest"}
+        self.validate(game, "impostor")
+        self.assertRejected({**game, "impostor": "e"}, "one of the options", "impostor")
+        self.assertRejected({**game, "options": ["a", "b", "c"]}, "exactly 4 options", "impostor")
+        self.assertRejected({**game, "why": "  "}, "non-empty string", "impostor")
+
+    def test_match_pairs(self):
+        pairs = {"t1": "d1", "t2": "d2", "t3": "d3"}
+        game = {"pairs": pairs, "why": {term: "reason" for term in pairs}}
+        self.validate(game, "match_pairs")
+        self.assertRejected({**game, "why": {"t1": "reason"}}, "every term", "match_pairs")
+        self.assertRejected({**game, "pairs": {"t1": "d1"}}, "3-5 pairs", "match_pairs")
+
+    def test_unknown_game_type(self):
+        self.assertRejected({}, "Unknown game_type", "crossword")
+
+
+if __name__ == "__main__":
+    unittest.main()
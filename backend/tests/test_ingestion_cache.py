@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from services import ingestion_cache
+
+
+RESULT = {
+    "core_concepts": ["Entropy", "Énergie"],
+    "definitions": [],
+    "examples": ["ΔS > 0"],
+    "diagram_descriptions": [],
+    "clean_markdown": "# Notes",
+}
+
+
+class IngestionCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+        env = mock.patch.dict(os.environ, {ingestion_cache.CACHE_DIR_ENV: self.directory})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_round_trip(self):
+        key = ingestion_cache.make_key("text", "hello", "2.1")
+        self.assertIsNone(ingestion_cache.get(key))
+        ingestion_cache.put(key, RESULT)
+        self.assertEqual(ingestion_cache.get(key), RESULT)
+
+    def test_disabled_without_directory(self):
+        with mock.patch.dict(os.environ, {ingestion_cache.CACHE_DIR_ENV: "  "}):
+            self.assertIsNone(ingestion_cache.cache_dir())
+            ingestion_cache.put("k", RESULT)
+            self.assertIsNone(ingestion_cache.get("k"))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_keys_separate_type_content_and_version(self):
+        keys = {
+            ingestion_cache.make_key("text", "abc", "1"),
+            ingestion_cache.make_key("pdf", "abc", "1"),
+            ingestion_cache.make_key("text", "abd", "1"),
+            ingestion_cache.make_key("text", "abc", "2"),
+            ingestion_cache.make_key("tex", "tabc", "1"),
+        }
+        self.assertEqual(len(keys), 5)
+        self.assertEqual(
+            ingestion_cache.make_key("pdf", b"abc", "1"),
+            ingestion_cache.make_key("pdf", "abc", "1"),
+        )
+
+    def test_write_is_atomic(self):
+        key = ingestion_cache.make_key("text", "atomic", "1")
+        ingestion_cache.put(key, RESULT)
+        # A failed rewrite leaves the previous entry intact and no temp file
+        with mock.patch("json.dump", side_effect=ValueError("boom")), \
+                self.assertLogs(ingestion_cache.logger, "WARNING"):
+            ingestion_cache.put(key, {"clean_markdown": "partial"})
+        self.assertEqual(ingestion_cache.get(key), RESULT)
+        self.assertEqual(os.listdir(self.directory), [f"{key}.json"])
+
+    def test_corrupt_entry_is_a_miss(self):
+        key = ingestion_cache.make_key("text", "corrupt", "1")
+        with open(os.path.join(self.directory, f"{key}.json"), "w", encoding="utf-8") as f:
+            f.write('{"core_concepts": [')
+        with self.assertLogs(ingestion_cache.logger, "WARNING"):
+            self.assertIsNone(ingestion_cache.get(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
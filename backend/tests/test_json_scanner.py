@@ -0,0 +1,81 @@
+import json
+import unittest
+
+from agents.game_master_agent import _JsonObjectScanner, _find_json_object
+
+
+OBJECT = '{"cards": ["a {b}", "c\\"}"], "why": {"a": "x\\\\"}, "n": {}}'
+
+
+def scan_in_pieces(text, cuts):
+    """Feed `text` split at `cuts`; return the object slice or None."""
+    scanner = _JsonObjectScanner()
+    start = 0
+    for cut in list(cuts) + [len(text)]:
+        if scanner.feed(text[start:cut]):
+            return text[scanner.start:scanner.end]
+        start = cut
+    return None
+
+
+class FindJsonObjectTests(unittest.TestCase):
+    def test_bare_object(self):
+        self.assertEqual(_find_json_object(OBJECT), OBJECT)
+
+    def test_fenced_output(self):
+        text = "```json\n" + OBJECT + "\n```"
+        self.assertEqual(_find_json_object(text), OBJECT)
+
+    def test_surrounding_prose(self):
+        text = "Here is the game:\n" + OBJECT + "\nHope this helps {really}!"
+        self.assertEqual(_find_json_object(text), OBJECT)
+
+    def test_braces_in_quoted_prose_before_object(self):
+        text = 'Use "{name}" placeholders, e.g. { name }. ' + OBJECT
+        self.assertEqual(_find_json_object(text), OBJECT)
+
+    def test_unbalanced_prose_quote_before_object(self):
+        text = 'A 5" screen {size} ' + OBJECT
+        self.assertEqual(_find_json_object(text), OBJECT)
+
+    def test_braces_and_escapes_inside_strings(self):
+        self.assertEqual(json.loads(_find_json_object(OBJECT))["cards"], ["a {b}", 'c"}'])
+
+    def test_incomplete_object_falls_back_to_tail(self):
+        self.assertEqual(_find_json_object('Sure: {"a": [1, 2'), '{"a": [1, 2')
+
+    def test_no_object_returns_text(self):
+        self.assertEqual(_find_json_object("  no json here  "), "no json here")
+
+
+class StreamingScannerTests(unittest.TestCase):
+    TEXT = 'Intro {x} "q" ```json\n{ \n ' + OBJECT[1:] + "\n``` trailing {"
+
+    def test_every_two_way_split(self):
+        expected = _find_json_object(self.TEXT)
+        for cut in range(len(self.TEXT) + 1):
+            with self.subTest(cut=cut):
+                self.assertEqual(scan_in_pieces(self.TEXT, [cut]), expected)
+
+    def test_one_character_chunks(self):
+        expected = _find_json_object(self.TEXT)
+        self.assertEqual(scan_in_pieces(self.TEXT, range(1, len(self.TEXT))), expected)
+
+    def test_split_after_candidate_brace_and_whitespace(self):
+        text = 'pre {  \n  "a": 1} post'
+        for cuts in ([5], [5, 8], [4, 5, 6, 7]):
+            with self.subTest(cuts=cuts):
+                self.assertEqual(scan_in_pieces(text, cuts), '{  \n  "a": 1}')
+
+    def test_rejected_brace_across_chunks(self):
+        self.assertEqual(scan_in_pieces('{  \n x} {"a": 1}', [3]), '{"a": 1}')
+
+    def test_feed_after_completion_is_noop(self):
+        scanner = _JsonObjectScanner()
+        self.assertTrue(scanner.feed('{"a": 1}'))
+        self.assertTrue(scanner.feed('{"b": 2}'))
+        self.assertEqual((scanner.start, scanner.end), (0, 8))
+
+
+if __name__ == "__main__":
+    unittest.main()